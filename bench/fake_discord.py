@@ -0,0 +1,166 @@
+import sys, asyncio, collections, datetime, itertools, random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import discord
+from gateway_bench import IN_VOICE, guild_create, user
+
+BOT_ID = 999
+BOT_USER = {**user(BOT_ID), "bot": True}
+TIMESTAMP = "2021-01-01T00:00:00+00:00"
+
+snowflakes = itertools.count(int(datetime.datetime(2021, 1, 1).timestamp() * 1000 - 1420070400000) << 22)
+
+def message(channel_id, guild_id, author, content="", embeds=(), components=(), member=None) :
+    data = {
+        "id": str(next(snowflakes)),
+        "channel_id": str(channel_id),
+        "guild_id": str(guild_id),
+        "author": author,
+        "content": content or "",
+        "timestamp": TIMESTAMP,
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [e for e in embeds if e],
+        "components": list(components),
+        "pinned": False,
+        "type": 0,
+    }
+    if member is not None :
+        data["member"] = member
+    return data
+
+class FakeHTTP :
+    # Stands in for discord.http.HTTPClient, every call costs one simulated round trip
+    def __init__(self, sim, latency=0.05) :
+        self.sim = sim
+        self.latency = latency
+        self.calls = collections.Counter()
+
+    async def round_trip(self, name) :
+        self.calls[name] += 1
+        await asyncio.sleep(self.latency * self.sim.random.uniform(0.5, 1.5))
+
+    async def send_message(self, channel_id, content, *, embed=None, **kwargs) :
+        await self.round_trip("send_message")
+        return message(channel_id, self.sim.guild_of(channel_id), BOT_USER, content, [embed])
+
+    async def edit_message(self, channel_id, message_id, **fields) :
+        await self.round_trip("edit_message")
+        data = message(channel_id, self.sim.guild_of(channel_id), BOT_USER, fields.get("content"), [fields.get("embed")])
+        data.update(id=str(message_id), edited_timestamp=TIMESTAMP)
+        return data
+
+    async def delete_message(self, channel_id, message_id, *, reason=None) :
+        await self.round_trip("delete_message")
+
+    async def request(self, route, **kwargs) :
+        await self.round_trip(f"{route.method} {route.path.split('/')[1]}")
+        body = kwargs.get("json") or {}
+
+        if route.method == "POST" and route.path == "/channels/{channel_id}/messages" :
+            channel_id = int(route.channel_id)
+            data = message(channel_id, self.sim.guild_of(channel_id), BOT_USER, body.get("content"),
+                           body.get("embeds", ()), body.get("components", ()))
+            if data["components"] :
+                self.sim.menu_shown(channel_id, data)
+            return data
+
+        return None
+
+    async def close(self) :
+        pass
+
+class FakeGateway :
+    # Stands in for the gateway websocket, voice state changes come back as VOICE_STATE/SERVER_UPDATE
+    def __init__(self, sim, latency=0.03) :
+        self.sim = sim
+        self.latency = latency
+        self.open = False
+        self.updates = 0
+
+    async def voice_state(self, guild_id, channel_id, self_mute=False, self_deaf=False) :
+        self.updates += 1
+        asyncio.ensure_future(self.voice_updates(int(guild_id), channel_id, self_mute, self_deaf))
+
+    async def voice_updates(self, guild_id, channel_id, self_mute, self_deaf) :
+        await asyncio.sleep(self.latency)
+        self.receive("VOICE_STATE_UPDATE", {
+            "guild_id": str(guild_id), "channel_id": channel_id, "user_id": str(BOT_ID), "session_id": f"session{guild_id}",
+            "deaf": False, "mute": False, "self_deaf": self_deaf, "self_mute": self_mute, "self_video": False,
+            "suppress": False, "member": {"user": BOT_USER, "roles": [], "joined_at": TIMESTAMP, "deaf": False, "mute": False},
+        })
+        if channel_id is not None :
+            self.receive("VOICE_SERVER_UPDATE", {"guild_id": str(guild_id), "token": "token", "endpoint": "voice.example.com"})
+
+    def receive(self, event, data) :
+        # Same order as DiscordWebSocket.received_message, raw listeners first, then the parser
+        self.sim.bot.dispatch("socket_response", {"op": 0, "t": event, "s": None, "d": data})
+        self.sim.state.parsers[event](data)
+
+class FakeDiscord :
+    def __init__(self, bot, api_latency=0.05, gateway_latency=0.03, pick_delay=0.5, seed=None) :
+        self.bot = bot
+        self.state = bot._connection
+        self.random = random.Random(seed)
+        self.http = FakeHTTP(self, api_latency)
+        self.gateway = FakeGateway(self, gateway_latency)
+        self.pick_delay = pick_delay
+        self.channels = {}
+        self.requesters = {}
+        self.picks = 0
+
+    def connect(self, guilds) :
+        # What READY and GUILD_CREATE would have filled in, without a token
+        self.bot.http = self.state.http = self.http
+        self.bot.ws = self.gateway
+        self.state.user = discord.ClientUser(state=self.state, data=BOT_USER)
+
+        for gid in range(1, guilds + 1) :
+            guild = self.state._add_guild_from_data(guild_create(gid * 10, IN_VOICE, False))
+            self.channels[guild.text_channels[0].id] = guild
+
+        self.bot._ready.set()
+        return list(self.state._guilds.values())
+
+    def guild_of(self, channel_id) :
+        return self.channels[channel_id].id
+
+    def listeners(self, guild) :
+        return [uid for uid in guild._voice_states if uid != BOT_ID]
+
+    def message(self, guild, author_id, content) :
+        channel = guild.text_channels[0]
+        data = message(channel.id, guild.id, user(author_id), content,
+                       member={"roles": [], "joined_at": TIMESTAMP, "deaf": False, "mute": False, "nick": None})
+        return discord.Message(state=self.state, channel=channel, data=data)
+
+    async def command(self, guild, author_id, content) :
+        self.requesters[guild.text_channels[0].id] = author_id
+        await self.bot.on_message(self.message(guild, author_id, content))
+
+    def menu_shown(self, channel_id, data) :
+        # The one who asked picks a result after a moment, as a select menu interaction
+        menu = data["components"][0]["components"][0]
+        guild_id, author_id = self.guild_of(channel_id), self.requesters[channel_id]
+        interaction = {
+            "id": str(next(snowflakes)), "token": "token", "type": 3, "version": 1,
+            "application_id": str(BOT_ID), "guild_id": str(guild_id), "channel_id": str(channel_id),
+            "member": {"user": user(author_id), "roles": [], "joined_at": TIMESTAMP, "deaf": False, "mute": False},
+            "message": data,
+            "data": {"custom_id": menu["custom_id"], "component_type": 3,
+                     "values": [self.random.choice(menu["options"])["value"]]},
+        }
+        self.bot.loop.call_later(self.pick_delay * self.random.uniform(0.5, 1.5), self.pick, interaction)
+
+    def pick(self, interaction) :
+        self.picks += 1
+        self.bot.dispatch("socket_response", {"op": 0, "t": "INTERACTION_CREATE", "s": None, "d": interaction})
+
+
+# bk-bot-mkb(fake discord), Created by BK Project
@@ -0,0 +1,342 @@
+import argparse, asyncio, base64, collections, json, random, time, zlib
+
+from aiohttp import web, WSMsgType
+
+SEARCH_PREFIXES = ("ytsearch:", "ytmsearch:", "scsearch:")
+SEARCH_RESULTS = 5 # Tracks returned for a search, like lavalink's youtube search page
+STREAM_LENGTH = 9223372036854775807 # What lavalink reports as the length of a live stream
+STUCK_THRESHOLD = 10000 # thresholdMs sent with TrackStuckEvent
+
+def encode(info) :
+    return base64.b64encode(json.dumps(info, separators=(",", ":")).encode()).decode()
+
+def decode(track) :
+    return json.loads(base64.b64decode(track))
+
+def track(identifier, title, uri, source="youtube", stream=False) :
+    info = {
+        "identifier": identifier,
+        "isSeekable": not stream,
+        "author": f"artist {zlib.crc32(identifier.encode()) % 100}",
+        # Same query, same length, so runs can be compared
+        "length": STREAM_LENGTH if stream else 120_000 + zlib.crc32(identifier.encode()) % 180_000,
+        "isStream": stream,
+        "position": 0,
+        "title": title,
+        "uri": uri,
+        "sourceName": source,
+    }
+    return {"track": encode(info), "info": info}
+
+def video_id(text) :
+    return base64.urlsafe_b64encode(zlib.crc32(text.encode()).to_bytes(8, "big")).decode()[:11]
+
+class FakePlayer :
+    __slots__ = ("guild_id", "ws", "track", "info", "position", "resumed", "paused", "volume", "fault", "task", "voice")
+
+    def __init__(self, guild_id, ws) :
+        self.guild_id = guild_id
+        self.ws = ws
+        self.track = None
+        self.info = None
+        self.position = 0
+        self.resumed = None
+        self.paused = False
+        self.volume = 100
+        self.fault = None
+        self.task = None
+        self.voice = None
+
+class FakeLavalink :
+    # Speaks the lavalink v3 REST and websocket protocol wavelink 0.9 uses, tracks play `speed` times faster
+    def __init__(
+        self, host="127.0.0.1", port=2333, password="bkserverlink", rest_latency=0.02, speed=1.0,
+        update_interval=5.0, stats_interval=60.0, stuck_rate=0.0, exception_rate=0.0, playlist_size=200, seed=None
+    ) :
+        self.host = host
+        self.port = port
+        self.password = password
+        self.rest_latency = rest_latency
+        self.speed = speed
+        self.update_interval = update_interval
+        self.stats_interval = stats_interval
+        self.stuck_rate = stuck_rate
+        self.exception_rate = exception_rate
+        self.playlist_size = playlist_size
+        self.random = random.Random(seed)
+        self.players = {}
+        self.sockets = set()
+        self.counts = collections.Counter()
+        self.started = time.time()
+        self._runner = None
+        self._tasks = []
+
+    def authorized(self, request) :
+        return request.headers.get("Authorization") == self.password
+
+    def load(self, identifier) :
+        if "nomatch" in identifier :
+            return {"loadType": "NO_MATCHES", "playlistInfo": {}, "tracks": []}
+
+        if "loadfail" in identifier :
+            return {
+                "loadType": "LOAD_FAILED", "playlistInfo": {}, "tracks": [],
+                "exception": {"message": "This video is unavailable", "severity": "COMMON"},
+            }
+
+        if identifier.startswith(SEARCH_PREFIXES) :
+            prefix, terms = identifier.split(":", 1)
+            source = "soundcloud" if prefix == "scsearch" else "youtube"
+            return {"loadType": "SEARCH_RESULT", "playlistInfo": {}, "tracks": [
+                track(vid := video_id(f"{terms}#{i}"), f"{terms} ({i + 1})", f"https://www.youtube.com/watch?v={vid}", source)
+                for i in range(SEARCH_RESULTS)
+            ]}
+
+        if "list=" in identifier or "/sets/" in identifier :
+            name = f"playlist {video_id(identifier)}"
+            return {"loadType": "PLAYLIST_LOADED", "playlistInfo": {"name": name, "selectedTrack": -1}, "tracks": [
+                track(vid := video_id(f"{identifier}#{i}"), f"{name} track {i + 1}", f"https://www.youtube.com/watch?v={vid}")
+                for i in range(self.playlist_size)
+            ]}
+
+        stream = "twitch.tv" in identifier
+        return {"loadType": "TRACK_LOADED", "playlistInfo": {}, "tracks": [
+            track(video_id(identifier), f"track {video_id(identifier)}", identifier, "twitch" if stream else "youtube", stream)
+        ]}
+
+    async def load_tracks(self, request) :
+        if not self.authorized(request) :
+            return web.Response(status=401)
+
+        self.counts["loadtracks"] += 1
+        await asyncio.sleep(self.rest_latency * self.random.uniform(0.5, 1.5))
+        return web.json_response(self.load(request.query.get("identifier", "")))
+
+    async def websocket(self, request) :
+        if not self.authorized(request) :
+            return web.Response(status=401)
+
+        ws = web.WebSocketResponse(heartbeat=None)
+        await ws.prepare(request)
+        self.sockets.add(ws)
+        self.counts["connections"] += 1
+        await self.send(ws, **self.stats())
+
+        try :
+            async for msg in ws :
+                if msg.type == WSMsgType.TEXT :
+                    await self.handle(ws, json.loads(msg.data))
+        finally :
+            self.sockets.discard(ws)
+            for player in [p for p in self.players.values() if p.ws is ws] :
+                self.destroy(player)
+
+        return ws
+
+    async def send(self, ws, **payload) :
+        if ws.closed :
+            return
+
+        self.counts[payload.get("type", payload["op"])] += 1
+        await ws.send_str(json.dumps(payload))
+
+    async def event(self, player, kind, **fields) :
+        await self.send(player.ws, op="event", type=kind, guildId=player.guild_id, track=player.track, **fields)
+
+    async def handle(self, ws, data) :
+        op, guild_id = data.get("op"), data.get("guildId")
+        self.counts[f"op_{op}"] += 1
+
+        if op == "destroy" :
+            if (player := self.players.get(guild_id)) is not None :
+                if player.track is not None :
+                    await self.end(player, "CLEANUP")
+                self.destroy(player)
+            return
+
+        if guild_id is None :
+            return
+
+        if (player := self.players.get(guild_id)) is None or player.ws is not ws :
+            player = self.players[guild_id] = FakePlayer(guild_id, ws)
+
+        if op == "voiceUpdate" :
+            player.voice = data.get("sessionId")
+
+        elif op == "play" :
+            if player.track is not None and data.get("noReplace") :
+                return
+            if player.track is not None :
+                await self.end(player, "REPLACED")
+
+            player.track = data["track"]
+            player.info = decode(data["track"])
+            player.position = int(data.get("startTime", 0))
+            player.paused = bool(data.get("pause", player.paused))
+            player.volume = int(data.get("volume", player.volume))
+            player.fault = self.roll()
+            await self.event(player, "TrackStartEvent")
+            self.resume(player)
+
+        elif op == "stop" :
+            if player.track is not None :
+                await self.end(player, "STOPPED")
+
+        elif op == "pause" :
+            if data.get("pause") and not player.paused :
+                player.position = self.position(player)
+                player.paused = True
+                self.cancel(player)
+            elif not data.get("pause") and player.paused :
+                player.paused = False
+                self.resume(player)
+
+        elif op == "seek" :
+            player.position = int(data.get("position", 0))
+            self.resume(player)
+
+        elif op == "volume" :
+            player.volume = int(data.get("volume", 100))
+
+    def roll(self) :
+        if (chance := self.random.random()) < self.exception_rate :
+            return "exception"
+        if chance < self.exception_rate + self.stuck_rate :
+            return "stuck"
+        return None
+
+    def position(self, player) :
+        if player.paused or player.resumed is None :
+            return player.position
+        return min(player.position + int((time.monotonic() - player.resumed) * 1000 * self.speed), player.info["length"])
+
+    def resume(self, player) :
+        self.cancel(player)
+        player.resumed = time.monotonic()
+        if not player.paused :
+            player.task = asyncio.ensure_future(self.play_out(player, player.track))
+
+    def cancel(self, player) :
+        if player.task is not None and player.task is not asyncio.current_task() :
+            player.task.cancel()
+        player.task = None
+
+    async def play_out(self, player, current) :
+        remaining = (player.info["length"] - player.position) / 1000 / self.speed
+
+        if (fault := player.fault) is not None :
+            player.fault = None
+            await asyncio.sleep(remaining * self.random.uniform(0.1, 0.5))
+
+            if fault == "exception" :
+                # Lavalink follows a failed track with its end event
+                await self.event(player, "TrackExceptionEvent", error="Something broke when playing the track.",
+                                 exception={"message": "Something broke when playing the track.", "severity": "FAULT"})
+                return await self.end(player, "LOAD_FAILED")
+
+            # A stuck track keeps playing, the client decides whether to skip it
+            await self.event(player, "TrackStuckEvent", thresholdMs=STUCK_THRESHOLD)
+            remaining = (player.info["length"] - self.position(player)) / 1000 / self.speed
+
+        if player.info["isStream"] :
+            await asyncio.get_event_loop().create_future()
+
+        await asyncio.sleep(remaining)
+        if player.track == current :
+            await self.end(player, "FINISHED")
+
+    async def end(self, player, reason) :
+        self.cancel(player)
+        await self.event(player, "TrackEndEvent", reason=reason)
+        player.track = player.info = None
+        player.position = 0
+
+    def destroy(self, player) :
+        self.cancel(player)
+        self.players.pop(player.guild_id, None)
+
+    def stats(self) :
+        playing = sum(1 for p in self.players.values() if p.track is not None and not p.paused)
+        return {
+            "op": "stats",
+            "players": len(self.players),
+            "playingPlayers": playing,
+            "uptime": int((time.time() - self.started) * 1000),
+            "memory": {"free": 100_000_000, "used": 200_000_000, "allocated": 300_000_000, "reservable": 1_000_000_000},
+            "cpu": {"cores": 4, "systemLoad": 0.1, "lavalinkLoad": min(playing / 1000, 1.0)},
+            "frameStats": {"sent": 3000 * playing, "nulled": 0, "deficit": 0},
+        }
+
+    async def send_updates(self) :
+        while True :
+            await asyncio.sleep(self.update_interval)
+            now = int(time.time() * 1000)
+            for player in list(self.players.values()) :
+                if player.track is not None :
+                    await self.send(player.ws, op="playerUpdate", guildId=player.guild_id,
+                                    state={"time": now, "position": self.position(player)})
+
+    async def send_stats(self) :
+        while True :
+            await asyncio.sleep(self.stats_interval)
+            stats = self.stats()
+            for ws in list(self.sockets) :
+                await self.send(ws, **stats)
+
+    async def start(self) :
+        app = web.Application()
+        app.router.add_get("/", self.websocket)
+        app.router.add_get("/loadtracks", self.load_tracks)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self._tasks = [asyncio.ensure_future(self.send_updates()), asyncio.ensure_future(self.send_stats())]
+
+    async def stop(self) :
+        for task in self._tasks :
+            task.cancel()
+        for player in list(self.players.values()) :
+            self.destroy(player)
+        for ws in list(self.sockets) :
+            await ws.close()
+        if self._runner is not None :
+            await self._runner.cleanup()
+            self._runner = None
+
+def main() :
+    parser = argparse.ArgumentParser(description="Stand-in lavalink node for running the bot without Lavalink.jar")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2333)
+    parser.add_argument("--password", default="bkserverlink")
+    parser.add_argument("--rest-latency", type=float, default=0.02, help="seconds per loadtracks request")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed, 60 plays a 3 minute track in 3 s")
+    parser.add_argument("--update-interval", type=float, default=5.0)
+    parser.add_argument("--stats-interval", type=float, default=60.0)
+    parser.add_argument("--stuck-rate", type=float, default=0.0, help="share of tracks that get stuck")
+    parser.add_argument("--exception-rate", type=float, default=0.0, help="share of tracks that fail")
+    parser.add_argument("--playlist-size", type=int, default=200)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = FakeLavalink(
+        args.host, args.port, args.password, args.rest_latency, args.speed, args.update_interval,
+        args.stats_interval, args.stuck_rate, args.exception_rate, args.playlist_size, args.seed
+    )
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(server.start())
+    print(f"Fake lavalink listening on {args.host}:{args.port}", flush=True)
+
+    try :
+        loop.run_forever()
+    except KeyboardInterrupt :
+        pass
+    finally :
+        loop.run_until_complete(server.stop())
+        print(json.dumps(dict(server.counts)), flush=True)
+
+if __name__ == "__main__" :
+    main()
+
+
+# bk-bot-mkb(fake lavalink), Created by BK Project
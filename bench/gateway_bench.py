@@ -0,0 +1,120 @@
+import sys, argparse, json, resource, subprocess, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import discord
+from bot.bot import gateway_options
+
+CHUNK_SIZE = 1000 # Members per GUILD_MEMBERS_CHUNK payload
+ONLINE = 0.2 # Share of members that are online
+IN_VOICE = 10 # Members sitting in voice per guild
+
+def user(uid) :
+    return {"id": str(uid), "username": f"user{uid}", "discriminator": "0001", "avatar": None, "bot": False}
+
+def member(uid) :
+    return {"user": user(uid), "roles": [], "joined_at": "2020-01-01T00:00:00+00:00", "deaf": False, "mute": False, "nick": None}
+
+def presence(uid) :
+    return {
+        "user": {"id": str(uid)},
+        "status": "online",
+        "activities": [{"name": "Some Game", "type": 0}],
+        "client_status": {"desktop": "online"},
+    }
+
+def guild_create(gid, members, full) :
+    first = gid * 10_000_000
+    voice = gid + 1
+    online = range(first, first + int(members * ONLINE))
+    in_voice = range(first, first + IN_VOICE)
+
+    return {
+        "id": str(gid),
+        "name": f"guild {gid}",
+        "member_count": members,
+        "large": members >= 250,
+        "roles": [{"id": str(gid), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                   "hoist": False, "managed": False, "mentionable": False}],
+        "channels": [
+            {"id": str(voice), "type": 2, "name": "Music", "position": 0, "permission_overwrites": [], "bitrate": 64000, "user_limit": 0},
+            {"id": str(voice + 1), "type": 0, "name": "general", "position": 1, "permission_overwrites": []},
+        ],
+        "voice_states": [
+            {"user_id": str(uid), "channel_id": str(voice), "session_id": "s", "deaf": False, "mute": False,
+             "self_deaf": False, "self_mute": False, "self_video": False, "suppress": False}
+            for uid in in_voice
+        ],
+        # Large guilds only ship online members with presences, or just the voice members without them
+        "members": [member(uid) for uid in (online if full else in_voice)],
+        "presences": [presence(uid) for uid in online] if full else [],
+    }
+
+def member_chunks(gid, members) :
+    first = gid * 10_000_000
+    for start in range(0, members, CHUNK_SIZE) :
+        yield [member(uid) for uid in range(first + start, first + min(start + CHUNK_SIZE, members))]
+
+def run(mode, guilds, members) :
+    options = gateway_options({"lean_gateway": mode == "lean"})
+    client = discord.Client(**options)
+    state = client._connection
+    full = state._intents.presences
+    chunk = state._chunk_guilds
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    parsing = 0.0
+    chunk_requests = 0
+
+    for gid in range(1, guilds + 1) :
+        data = guild_create(gid, members, full)
+        started = time.perf_counter()
+        guild = state._add_guild_from_data(data)
+        parsing += time.perf_counter() - started
+
+        if chunk :
+            chunk_requests += 1
+            for payload in member_chunks(gid, members) :
+                started = time.perf_counter()
+                for mdata in payload :
+                    guild._add_member(discord.Member(data=mdata, guild=guild, state=state))
+                parsing += time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "guilds": guilds,
+        "cached_members": sum(len(g._members) for g in state._guilds.values()),
+        "chunk_requests": chunk_requests,
+        "parse_seconds": parsing,
+        "rss_mib": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base) / 1024,
+    }
+
+def main() :
+    parser = argparse.ArgumentParser(description="Gateway cache cost of full vs lean intents")
+    parser.add_argument("--guilds", type=int, default=100)
+    parser.add_argument("--members", type=int, default=1000)
+    parser.add_argument("--mode", choices=("full", "lean"))
+    args = parser.parse_args()
+
+    if args.mode :
+        print(json.dumps(run(args.mode, args.guilds, args.members)))
+        return
+
+    # One process per mode so their peak RSS doesn't mix
+    results = [
+        json.loads(subprocess.check_output([
+            sys.executable, __file__, "--mode", mode, "--guilds", str(args.guilds), "--members", str(args.members)
+        ]))
+        for mode in ("full", "lean")
+    ]
+
+    print(f"{args.guilds:,} guilds x {args.members:,} members")
+    print(f"{'mode':<6}{'cached members':>16}{'chunk requests':>16}{'ready work (s)':>16}{'RSS growth (MiB)':>18}")
+    for r in results :
+        print(f"{r['mode']:<6}{r['cached_members']:>16,}{r['chunk_requests']:>16,}{r['parse_seconds']:>16.2f}{r['rss_mib']:>18.1f}")
+
+if __name__ == "__main__" :
+    main()
+
+
+# bk-bot-mkb(gateway benchmark), Created by BK Project
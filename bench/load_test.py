@@ -0,0 +1,233 @@
+import sys, argparse, asyncio, collections, json, logging, os, random, resource, signal, socket, subprocess, tempfile, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from discord.ext import commands
+
+from bot.bot import BotSetup
+from bot.utils import LoopWatchdog
+from bot.utils.store import TrackStore
+from fake_discord import FakeDiscord
+
+log = logging.getLogger("bench.load_test")
+
+PASSWORD = "loadtest"
+NODE_TIMEOUT = 10 # Seconds to wait for the bot to connect to the fake node
+# What a guild does between commands, play is mostly links like on the real bot
+WEIGHTS = {"play": 30, "play search": 8, "play playlist": 2, "queue": 20, "skip": 20, "volume": 20}
+VOLUMES = (".volume 50", ".volume 80", ".volume up", ".volume down")
+
+def free_port() :
+    with socket.socket() as sock :
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def rss_mib() :
+    # Current RSS on linux, peak RSS elsewhere
+    try :
+        with open("/proc/self/statm") as statm :
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError :
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentile(values, share) :
+    if not values :
+        return 0.0
+
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+def command(rng, label) :
+    if label == "play" :
+        return f".play https://www.youtube.com/watch?v={rng.randrange(10**10):011d}"
+    if label == "play search" :
+        return f".play song number {rng.randrange(1000)}"
+    if label == "play playlist" :
+        return f".play https://www.youtube.com/playlist?list=PL{rng.randrange(10**6)}"
+    if label == "volume" :
+        return rng.choice(VOLUMES)
+    return f".{label}"
+
+def start_lavalink(args, port) :
+    # Its own process, so the node's work doesn't show up as bot loop lag or memory
+    proc = subprocess.Popen([
+        sys.executable, str(ROOT / "bench" / "fake_lavalink.py"), "--port", str(port), "--password", PASSWORD,
+        "--speed", str(args.speed), "--rest-latency", str(args.rest_latency),
+        "--stuck-rate", str(args.stuck_rate), "--exception-rate", str(args.exception_rate), "--seed", str(args.seed),
+    ], stdout=subprocess.PIPE, text=True)
+    proc.stdout.readline()
+    return proc
+
+def stop_lavalink(proc) :
+    proc.send_signal(signal.SIGINT)
+    out, _ = proc.communicate(timeout=10)
+    lines = out.strip().splitlines()
+    return json.loads(lines[-1]) if lines else {}
+
+class LoadTest :
+    def __init__(self, bot, sim, args) :
+        self.bot = bot
+        self.sim = sim
+        self.args = args
+        self.latencies = collections.defaultdict(list)
+        self.errors = collections.Counter()
+
+    async def on_command_error(self, ctx, exc) :
+        error = getattr(exc, "original", exc)
+        self.errors[name := type(error).__name__] += 1
+
+        # A listener silences discord.py's default traceback, so bugs are logged here, once per type
+        if not isinstance(error, commands.CommandError) and self.errors[name] == 1 :
+            log.error("%s raised in %s", name, ctx.command, exc_info=(type(error), error, error.__traceback__))
+
+    async def wait_for_node(self, music) :
+        deadline = time.monotonic() + NODE_TIMEOUT
+        while not any(node.is_available for node in music.wavelink.nodes.values()) :
+            if time.monotonic() > deadline :
+                raise RuntimeError("The bot never connected to the fake lavalink node")
+            await asyncio.sleep(0.05)
+
+    async def drive(self, guild, seed) :
+        rng = random.Random(seed)
+        listeners = self.sim.listeners(guild)
+        # The first .play connects the player, everything after is a random mix
+        labels = ["play"] + rng.choices(list(WEIGHTS), weights=list(WEIGHTS.values()), k=self.args.commands - 1)
+
+        for label in labels :
+            await asyncio.sleep(self.args.think * rng.uniform(0.5, 1.5))
+            started = time.perf_counter()
+            await self.sim.command(guild, rng.choice(listeners), command(rng, label))
+            self.latencies[label].append(time.perf_counter() - started)
+
+    async def run(self, guilds) :
+        music = self.bot.get_cog("Music")
+        await self.wait_for_node(music)
+
+        # A throwaway track store, so runs neither read nor fill bot/data/tracks.db
+        await music.store.close()
+        tmp = tempfile.TemporaryDirectory()
+        music.store = music.resolver.store = TrackStore(str(Path(tmp.name) / "tracks.db"))
+        self.bot.add_listener(self.on_command_error)
+
+        rss_before = rss_mib()
+        started = time.perf_counter()
+        await asyncio.gather(*(self.drive(guild, self.args.seed + i) for i, guild in enumerate(guilds)))
+        elapsed = time.perf_counter() - started
+        rss_after = rss_mib()
+
+        players = music.all_players()
+        result = {
+            "guilds": len(guilds),
+            "commands": sum(len(v) for v in self.latencies.values()),
+            "failed": sum(self.errors.values()),
+            "errors": dict(self.errors),
+            "seconds": elapsed,
+            "throughput": sum(len(v) for v in self.latencies.values()) / elapsed,
+            "latency_ms": {
+                label: {
+                    "count": len(values),
+                    "p50": percentile(values, 0.5) * 1000,
+                    "p95": percentile(values, 0.95) * 1000,
+                    "p99": percentile(values, 0.99) * 1000,
+                    "max": max(values) * 1000,
+                }
+                for label, values in sorted(self.latencies.items()) + [("all", sum(self.latencies.values(), []))]
+            },
+            "loop_lag_ms": {k: v * 1000 for k, v in self.bot.watchdog.stats().items() if k != "stalls"},
+            "loop_stalls": self.bot.watchdog.stalled,
+            "rss_mib": {"before": rss_before, "after": rss_after, "growth": rss_after - rss_before},
+            "players": len(players),
+            "average_gap_ms": sum(p.average_gap for p in players) / len(players) if players else 0.0,
+            "discord_calls": dict(self.sim.http.calls),
+            "menu_picks": self.sim.picks,
+            "responses": self.bot.responses.stats(),
+        }
+
+        for player in players :
+            player.cancel_ingest()
+        await self.bot.shutdown()
+        await music.wavelink.session.close()
+        await music.store.close()
+        tmp.cleanup()
+        return result
+
+def report(result, lavalink) :
+    print(f"{result['guilds']} guilds, {result['commands']:,} commands in {result['seconds']:.1f} s "
+          f"= {result['throughput']:.1f} commands/s, {result['failed']} failed {result['errors'] or ''}")
+    print()
+    print(f"{'command':<16}{'count':>8}{'p50 (ms)':>12}{'p95 (ms)':>12}{'p99 (ms)':>12}{'max (ms)':>12}")
+    for label, r in result["latency_ms"].items() :
+        print(f"{label:<16}{r['count']:>8}{r['p50']:>12.1f}{r['p95']:>12.1f}{r['p99']:>12.1f}{r['max']:>12.1f}")
+
+    lag = result["loop_lag_ms"]
+    print()
+    print(f"event loop lag  p50 {lag['p50']:.1f} ms, p99 {lag['p99']:.1f} ms, max {lag['max']:.1f} ms, {result['loop_stalls']} stalls")
+    print(f"memory          RSS {result['rss_mib']['before']:.1f} MiB -> {result['rss_mib']['after']:.1f} MiB "
+          f"({result['rss_mib']['growth']:+.1f} MiB) for {result['players']} players")
+    print(f"playback        {result['average_gap_ms']:.1f} ms average gap between tracks")
+    print(f"discord api     {', '.join(f'{k} {v}' for k, v in sorted(result['discord_calls'].items()))}, {result['menu_picks']} menu picks")
+    print(f"lavalink        {', '.join(f'{k} {v}' for k, v in sorted(lavalink.items()))}")
+
+def main() :
+    parser = argparse.ArgumentParser(description="Drive the bot with simulated guilds against a fake lavalink node")
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--commands", type=int, default=20, help="commands sent per guild")
+    parser.add_argument("--think", type=float, default=1.0, help="average seconds between a guild's commands")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="seconds per discord API call")
+    parser.add_argument("--gateway-latency", type=float, default=0.03, help="seconds before voice updates arrive")
+    parser.add_argument("--pick-delay", type=float, default=0.5, help="seconds before a search result is picked")
+    parser.add_argument("--rest-latency", type=float, default=0.02, help="seconds per lavalink loadtracks request")
+    parser.add_argument("--speed", type=float, default=60.0, help="playback speed of the fake node")
+    parser.add_argument("--stuck-rate", type=float, default=0.01)
+    parser.add_argument("--exception-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="ERROR", help="bot log level during the run")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    # BotSetup reads its config and cogs relative to the repo root
+    os.chdir(ROOT)
+    port = free_port()
+    lavalink = start_lavalink(args, port)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try :
+        # Voice goes through lavalink, the missing PyNaCl warning is noise here
+        logging.getLogger("discord.client").setLevel(logging.ERROR)
+        bot = BotSetup()
+        logging.getLogger().setLevel(args.log_level)
+        bot.config["metrics"]["enabled"] = False
+        bot.config["watchdog"]["enabled"] = True
+        bot.config["nodes"] = [{
+            "identifier": "FAKE", "host": "127.0.0.1", "port": port, "rest_uri": f"http://127.0.0.1:{port}",
+            "password": PASSWORD, "region": "singapore",
+        }]
+        # Keeps every lag sample of the run, not just the last minute
+        bot.watchdog = LoopWatchdog(threshold=bot.config["watchdog"]["threshold"], samples=None)
+
+        sim = FakeDiscord(bot, args.api_latency, args.gateway_latency, args.pick_delay, args.seed)
+        guilds = sim.connect(args.guilds)
+        bot.setup()
+        result = loop.run_until_complete(LoadTest(bot, sim, args).run(guilds))
+    finally :
+        for task in asyncio.all_tasks(loop) :
+            task.cancel()
+        loop.run_until_complete(asyncio.sleep(0.1))
+        loop.close()
+        counts = stop_lavalink(lavalink)
+
+    result["lavalink"] = counts
+    if args.json :
+        print(json.dumps(result, indent=2))
+    else :
+        report(result, counts)
+
+if __name__ == "__main__" :
+    main()
+
+
+# bk-bot-mkb(load test), Created by BK Project
@@ -0,0 +1,58 @@
+import sys, base64, gc, os, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import wavelink
+from bot.cogs.music import Queue
+
+COUNT = 100000
+
+def fake_track(i) :
+    identifier = f"{i:011d}"
+    info = {
+        "identifier": identifier,
+        "isSeekable": True,
+        "author": f"Artist {i % 500}",
+        "length": 180000 + i % 60000,
+        "isStream": False,
+        "position": 0,
+        "title": f"Song number {i} (Official Music Video)",
+        "uri": f"https://www.youtube.com/watch?v={identifier}",
+        "sourceName": "youtube",
+    }
+    # Encoded tracks are a base64 blob of roughly this size
+    return wavelink.Track(base64.b64encode(os.urandom(150) + identifier.encode()).decode(), info)
+
+def measure(build) :
+    gc.collect()
+    tracemalloc.start()
+    queue = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, queue
+
+def tracks_queue() :
+    # Old behaviour, full Track objects kept in a list
+    return [fake_track(i) for i in range(COUNT)]
+
+def entries_queue() :
+    queue = Queue()
+    for i in range(0, COUNT, 1000) :
+        queue.add(*[fake_track(j) for j in range(i, min(i + 1000, COUNT))])
+    return queue
+
+def main() :
+    before, _ = measure(tracks_queue)
+    after, _ = measure(entries_queue)
+    print(f"{COUNT:,} queued tracks")
+    print(f" wavelink.Track list : {before / 2**20:8.1f} MiB ({before / COUNT:.0f} B/track)")
+    print(f" QueueEntry queue    : {after / 2**20:8.1f} MiB ({after / COUNT:.0f} B/track)")
+    print(f" saved               : {(before - after) / 2**20:8.1f} MiB ({1 - after / before:.0%})")
+
+if __name__ == "__main__" :
+    main()
+
+
+# bk-bot-mkb(memory benchmark), Created by BK Project
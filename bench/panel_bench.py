@@ -0,0 +1,57 @@
+import sys, argparse, asyncio, random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import discord
+from bot.utils import PanelBoard
+
+class FakeMessage :
+    async def edit(self, embed=None) :
+        pass
+
+def renderer(clock, length, paused, interval) :
+    def render() :
+        # Same rounding as Music.render_panel, paused players stand still
+        position = 0 if paused else min(clock[0], length) // interval * interval
+        return discord.Embed(title="Now Playing", description=f"{position}/{length}")
+    return render
+
+async def run(guilds, minutes, paused, poll, interval, max_edits) :
+    board = PanelBoard(max_edits=max_edits)
+    clock = [0]
+
+    for gid in range(guilds) :
+        render = renderer(clock, random.randint(120, 360), random.random() < paused, interval)
+        board.open(gid, FakeMessage(), render, render())
+
+    ticks = minutes * 60 // interval
+    for _ in range(ticks) :
+        clock[0] += interval
+        await board.tick()
+
+    # Without the panel, every viewer keeps asking .np on their own
+    return board.stats(), guilds * minutes * 60 // poll, ticks
+
+def main() :
+    parser = argparse.ArgumentParser(description="Messages sent by .np polling vs shared live panels")
+    parser.add_argument("--guilds", type=int, default=200)
+    parser.add_argument("--minutes", type=int, default=10)
+    parser.add_argument("--paused", type=float, default=0.2, help="share of guilds with a paused player")
+    parser.add_argument("--poll", type=int, default=15, help="seconds between .np calls per guild")
+    parser.add_argument("--interval", type=int, default=10, help="panel refresh interval in seconds")
+    parser.add_argument("--max-edits", type=int, default=20)
+    args = parser.parse_args()
+
+    stats, polled, ticks = asyncio.run(run(args.guilds, args.minutes, args.paused, args.poll, args.interval, args.max_edits))
+
+    print(f"{args.guilds:,} guilds over {args.minutes} minutes ({ticks} refreshes)")
+    print(f".np polling : {polled:>8,} messages")
+    print(f"live panels : {stats['edits']:>8,} edits, {stats['skipped']:,} unchanged renders skipped")
+    print(f"edit budget : {args.max_edits * ticks:>8,} ({args.max_edits} per refresh)")
+
+if __name__ == "__main__" :
+    main()
+
+
+# bk-bot-mkb(panel benchmark), Created by BK Project
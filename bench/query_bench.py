@@ -0,0 +1,43 @@
+import sys, re, timeit
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bot.utils import classify
+from bot.utils.query import URL_REGEX
+
+QUERIES = {
+    "search": "never gonna give you up",
+    "long search": "some artist - a rather long song title (official music video) [remastered 2009] lyrics",
+    "youtube": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "youtube playlist": "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI",
+    "soundcloud": "https://soundcloud.com/artist/sets/album",
+    "no scheme": "www.example.com/music/song.mp3",
+}
+
+def old_classify(query) :
+    # What play_command did before: the raw pattern string, then the playlist check
+    query = query.strip("<>")
+    if not re.match(URL_REGEX.pattern, query) :
+        return f"ytsearch:{query}"
+
+    parts = urlsplit(query)
+    if "list" in parse_qs(parts.query) and parts.netloc.lower().endswith("youtube.com") :
+        return parse_qs(parts.query).get("v", [None])[0]
+    return query
+
+def main() :
+    print(f"{'query':<18}{'old (us)':>12}{'classify (us)':>16}{'speedup':>10}")
+
+    for name, query in QUERIES.items() :
+        number = 20000
+        before = min(timeit.repeat(lambda : old_classify(query), number=number, repeat=3)) / number * 1e6
+        after = min(timeit.repeat(lambda : classify(query), number=number, repeat=3)) / number * 1e6
+        print(f"{name:<18}{before:>12.2f}{after:>16.2f}{before / after:>9.1f}x")
+
+if __name__ == "__main__" :
+    main()
+
+
+# bk-bot-mkb(query benchmark), Created by BK Project
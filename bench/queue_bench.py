@@ -0,0 +1,76 @@
+import sys, timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bot.cogs.music import Queue
+from memory_bench import fake_track
+
+SIZES = (100, 5000, 100000)
+
+class ListQueue :
+    # The list backed Queue this replaced, kept for comparison
+    def __init__(self) :
+        self._queue = []
+        self.position = 0
+
+    @property
+    def upcoming(self) :
+        return self._queue[self.position + 1:]
+
+    def add(self, *args) :
+        self._queue.extend(args)
+
+    def get_next_track(self) :
+        self.position += 1
+        return self._queue[self.position]
+
+    def remove(self, index) :
+        return self._queue.pop(index)
+
+    def insert(self, index, track) :
+        self._queue.insert(index, track)
+
+
+def build(cls, size) :
+    # History as long as the queue, so trim_history doesn't drop entries between timed rounds
+    queue = cls(history_size=size) if cls is Queue else cls()
+    queue.add(*(fake_track(i) for i in range(size)))
+    queue.position = size // 2
+    return queue
+
+def cases(cls, size) :
+    queue = build(cls, size)
+    mid = size // 2
+
+    def remove_insert() :
+        queue.insert(mid // 2, queue.remove(mid // 2))
+
+    def advance() :
+        queue.position = mid
+        queue.get_next_track()
+
+    return {
+        "upcoming empty check": lambda : bool(queue.upcoming),
+        "upcoming[:10]": lambda : queue.upcoming[:10],
+        "advance": advance,
+        "remove+insert": remove_insert,
+    }
+
+def main() :
+    print(f"{'case':<22}{'size':>8}{'list (us)':>14}{'queue (us)':>14}{'speedup':>10}")
+
+    for size in SIZES :
+        old, new = cases(ListQueue, size), cases(Queue, size)
+
+        for name in old :
+            number = 2000
+            before = min(timeit.repeat(old[name], number=number, repeat=3)) / number * 1e6
+            after = min(timeit.repeat(new[name], number=number, repeat=3)) / number * 1e6
+            print(f"{name:<22}{size:>8}{before:>14.2f}{after:>14.2f}{before / after:>9.1f}x")
+
+if __name__ == "__main__" :
+    main()
+
+
+# bk-bot-mkb(queue benchmark), Created by BK Project
@@ -0,0 +1,97 @@
+import sys, argparse, asyncio, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import bot.utils.responses as responses
+from bot.utils import Responder, SelectionManager
+
+REACTION_INTERVAL = 0.25 # Discord lets a channel add one reaction per 250 ms
+
+class FakeMessage :
+    async def delete(self) :
+        pass
+
+    async def add_reaction(self, emoji) :
+        await asyncio.sleep(LATENCY + REACTION_INTERVAL)
+
+class FakeHTTP :
+    async def request(self, route, json=None) :
+        await asyncio.sleep(LATENCY)
+
+class FakeBot :
+    def __init__(self) :
+        self.http = FakeHTTP()
+        self.responses = Responder()
+        self.selections = SelectionManager(self)
+
+class FakeCtx :
+    def __init__(self, bot, gid) :
+        self.bot = bot
+        self.message = object()
+        self.guild = self.channel = self.author = type("Snowflake", (), {"id": gid})()
+
+    async def send(self, embed=None) :
+        await asyncio.sleep(LATENCY)
+        return FakeMessage()
+
+async def fake_send_components(ctx, embed, components) :
+    await asyncio.sleep(LATENCY)
+    return FakeMessage()
+
+async def reactions(ctx, choices) :
+    # The old flow, results message then one reaction per choice
+    started = time.perf_counter()
+    msg = await ctx.send(embed=None)
+    for _ in range(choices) :
+        await msg.add_reaction(None)
+    return time.perf_counter() - started
+
+async def components(bot, ctx, choices, think) :
+    async def click() :
+        await asyncio.sleep(think)
+        custom_id = next(k for k in bot.selections._pending if k.startswith(f"choose:{ctx.guild.id}:"))
+        await bot.selections.resolve({
+            "id": "0", "token": "t", "user": {"id": str(ctx.author.id)},
+            "data": {"custom_id": custom_id, "values": ["0"]},
+        })
+
+    asyncio.ensure_future(click())
+    return await bot.selections.choose(ctx, None, [f"track {i}" for i in range(choices)])
+
+async def run(guilds, choices, think) :
+    bot = FakeBot()
+    ctxs = [FakeCtx(bot, gid) for gid in range(1, guilds + 1)]
+
+    old = await asyncio.gather(*(reactions(ctx, choices) for ctx in ctxs))
+
+    started = time.perf_counter()
+    picks = await asyncio.gather(*(components(bot, ctx, choices, think) for ctx in ctxs))
+    total = time.perf_counter() - started
+
+    return old, bot.selections.stats(), picks, total
+
+def main() :
+    global LATENCY
+
+    parser = argparse.ArgumentParser(description="Time until the track selection can be used, reactions vs select menu")
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--choices", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.08, help="simulated REST round trip in seconds")
+    parser.add_argument("--think", type=float, default=0.5, help="simulated time before the user picks")
+    args = parser.parse_args()
+
+    LATENCY = args.latency
+    responses.send_components = fake_send_components
+    old, stats, picks, total = asyncio.run(run(args.guilds, args.choices, args.think))
+
+    print(f"{args.guilds:,} concurrent selections, {args.choices} choices, {LATENCY * 1000:.0f} ms round trip")
+    print(f"reactions   : {sum(old) / len(old) * 1000:>8.0f} ms to selectable ({1 + args.choices} requests)")
+    print(f"select menu : {stats['ui_time'] * 1000:>8.0f} ms to selectable (1 request)")
+    print(f"resolved {stats['picked']:,}/{len(picks):,} picks in {total:.2f} s, {stats['pending']} left pending")
+
+if __name__ == "__main__" :
+    main()
+
+
+# bk-bot-mkb(selection benchmark), Created by BK Project
@@ -0,0 +1,288 @@
+import sys, argparse, asyncio, gc, json, logging, os, platform, statistics, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bot.bot import BotSetup
+from bot.cogs.music import HISTORY_SIZE, Queue, choices_embed, queue_embed
+from bot.utils import classify
+from bot.utils.query import URL_REGEX
+from fake_discord import FakeDiscord
+from memory_bench import fake_track
+
+BASELINE = ROOT / "bench" / "baselines.json"
+SIZES = (10, 100, 1000, 10000, 100000)
+TOLERANCE = 0.25 # Share a case may be slower than its baseline before it counts as a regression
+MIN_TIME = 0.05 # Seconds each timing round runs for at least
+SAVE_RUNS = 3 # Full runs whose median becomes the baseline
+RETRIES = 2 # Extra runs of the cases that look regressed, before they are reported
+
+# What people type after .play, most of it plain searches
+SEARCHES = [
+    "never gonna give you up", "lofi hip hop radio", "some artist - a rather long song title (official music video)",
+    "ytsearch:daft punk around the world", "scsearch:chillhop essentials", "ytmsearch:bohemian rhapsody",
+    "song.mp3", "mr. brightside", "1.5 hours of rain sounds", "bts", "let it go frozen 10 hours",
+    "ytsearch: lagu galau 2021 terbaru", "ambient study music 4k", "can't stop the feeling", "remix 2.0",
+]
+LINKS = [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "https://youtu.be/dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI",
+    "https://www.youtube.com/playlist?list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI", "https://m.youtube.com/watch?v=dQw4w9WgXcQ&t=42s",
+    "https://www.youtube.com/shorts/dQw4w9WgXcQ", "https://music.youtube.com/watch?v=dQw4w9WgXcQ&feature=share",
+    "<https://www.youtube.com/watch?v=dQw4w9WgXcQ>", "https://soundcloud.com/artist/track-name",
+    "https://soundcloud.com/artist/sets/album", "https://www.twitch.tv/somestreamer", "https://vimeo.com/76979871",
+    "https://artist.bandcamp.com/album/some-album", "https://example.com/music/song.mp3", "www.example.com/music/song.mp3",
+]
+
+class Case :
+    __slots__ = ("name", "size", "func", "ops", "is_async")
+
+    def __init__(self, name, size, func, ops=1, is_async=False) :
+        self.name = name
+        self.size = size
+        self.func = func
+        self.ops = ops
+        self.is_async = is_async
+
+    @property
+    def key(self) :
+        return f"{self.name}/{self.size}" if self.size else self.name
+
+def queue_cases(tracks, size) :
+    queue = Queue()
+    queue.add(*tracks[:size])
+    mid = size // 2
+    # Kept under HISTORY_SIZE, so advancing never trims the queue between rounds
+    start = min(mid, HISTORY_SIZE) - 1
+    index = (size + mid) // 2
+
+    def add() :
+        Queue().add(*tracks[:size])
+
+    def get_next_track() :
+        queue.position = start
+        queue.get_next_track()
+
+    def upcoming() :
+        queue.position = mid
+        return [t.title for t in queue.upcoming[:10]]
+
+    def shuffle() :
+        queue.position = mid
+        queue.shuffle()
+
+    def remove() :
+        queue.insert(index, queue.remove(index))
+
+    return [
+        Case("queue.add", size, add),
+        Case("queue.get_next_track", size, get_next_track),
+        Case("queue.upcoming[:10]", size, upcoming),
+        Case("queue.shuffle", size, shuffle),
+        Case("queue.remove+insert", size, remove),
+    ]
+
+def dispatch_cases(bot, sim, guild) :
+    author = sim.listeners(guild)[0]
+    chat = sim.message(guild, author, "did anyone see the match last night?")
+    command = sim.message(guild, author, ".play never gonna give you up")
+
+    async def prefix() :
+        await bot.prefix(bot, command)
+
+    async def on_message() :
+        await bot.on_message(chat)
+
+    async def context() :
+        await bot.get_context(command)
+
+    return [
+        Case("prefix.matcher", 0, prefix, is_async=True),
+        Case("on_message.chat", 0, on_message, is_async=True),
+        Case("get_context.command", 0, context, is_async=True),
+    ]
+
+def classify_cases() :
+    corpus = SEARCHES * 4 + LINKS
+
+    def run_classify(queries) :
+        return lambda : [classify(q) for q in queries]
+
+    return [
+        Case("classify.searches", 0, run_classify(SEARCHES), len(SEARCHES)),
+        Case("classify.links", 0, run_classify(LINKS), len(LINKS)),
+        Case("classify.corpus", 0, run_classify(corpus), len(corpus)),
+        Case("url_regex.corpus", 0, lambda : [URL_REGEX.match(q) for q in corpus], len(corpus)),
+    ]
+
+def embed_cases(tracks, author) :
+    queue = Queue()
+    queue.add(*tracks[:1000])
+    choices = tracks[:5]
+
+    return [
+        Case("embed.queue", 0, lambda : queue_embed(author, queue, 10).to_dict()),
+        Case("embed.choices", 0, lambda : choices_embed(author, choices).to_dict()),
+    ]
+
+def calibrate() :
+    # Fixed pure python work, scales the baselines to the speed of the machine checking them
+    total = 0
+    for i in range(10000) :
+        total += i * i % 7
+    return total
+
+def measure(loop, case, repeat) :
+    if case.is_async :
+        async def batch(number) :
+            started = time.perf_counter()
+            for _ in range(number) :
+                await case.func()
+            return time.perf_counter() - started
+
+        timed = lambda number : loop.run_until_complete(batch(number))
+    else :
+        def timed(number) :
+            func = case.func
+            started = time.perf_counter()
+            for _ in range(number) :
+                func()
+            return time.perf_counter() - started
+
+    # Collections are off while timing, like timeit, or 100k live tracks make every round a gc round
+    gc.collect()
+    gc.disable()
+    try :
+        number = 1
+        while (elapsed := timed(number)) < MIN_TIME :
+            number *= 10 if elapsed < MIN_TIME / 10 else 2
+
+        # Fastest round, the slower ones measure whatever else the machine was doing
+        best = min([elapsed] + [timed(number) for _ in range(repeat - 1)])
+    finally :
+        gc.enable()
+
+    return best / number / case.ops * 1e6
+
+def build_bot() :
+    # BotSetup reads its config relative to the repo root
+    os.chdir(ROOT)
+    logging.getLogger("discord.client").setLevel(logging.ERROR)
+    bot = BotSetup()
+    logging.getLogger().setLevel(logging.ERROR)
+    sim = FakeDiscord(bot)
+    return bot, sim, sim.connect(1)[0]
+
+def run(wanted, repeat) :
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    bot, sim, guild = build_bot()
+    tracks = [fake_track(i) for i in range(max(SIZES))]
+
+    cases = [c for size in SIZES for c in queue_cases(tracks, size)]
+    cases += dispatch_cases(bot, sim, guild)
+    cases += classify_cases()
+    cases += embed_cases(tracks, sim.message(guild, sim.listeners(guild)[0], ".queue").author)
+
+    results = {"calibration": measure(loop, Case("calibration", 0, calibrate), repeat)}
+    try :
+        for case in cases :
+            if wanted(case.key) :
+                results[case.key] = measure(loop, case, repeat)
+    finally :
+        bot.log_listener.stop()
+        loop.close()
+
+    return results
+
+def combine(runs, pick) :
+    # Each run counts in units of its own calibration loop, the machine may have got busier in between
+    calibration = statistics.median(r["calibration"] for r in runs)
+    keys = dict.fromkeys(k for r in runs for k in r if k != "calibration")
+    return {"calibration": calibration, **{
+        key: pick([r[key] / r["calibration"] for r in runs if key in r]) * calibration for key in keys
+    }}
+
+def compare(current, baseline, tolerance) :
+    # Baselines are scaled by how fast this machine ran the calibration loop
+    scale = current["calibration"] / baseline["calibration"]
+    rows = []
+
+    for key, value in current.items() :
+        if key == "calibration" :
+            continue
+        if (before := baseline.get(key)) is None :
+            rows.append((key, value, None, None, "new"))
+            continue
+        ratio = value / (before * scale)
+        rows.append((key, value, before * scale, ratio, "REGRESSED" if ratio > 1 + tolerance else "ok"))
+
+    return scale, rows
+
+def write_json(path, data) :
+    # Same line endings as the rest of the repo's json
+    with open(path, "w", newline="\r\n") as out :
+        out.write(json.dumps(data, indent=2) + "\n")
+
+def main() :
+    parser = argparse.ArgumentParser(description="Offline microbenchmarks of the queue, dispatch and rendering hot paths")
+    parser.add_argument("names", nargs="*", help="only run cases whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds per case, the fastest counts")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit with 1 if a case regressed against the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+
+    wanted = lambda key : not args.names or any(name in key for name in args.names)
+    # A baseline is the median of a few runs, so one lucky run doesn't become the bar
+    runs = [run(wanted, args.repeat) for _ in range(SAVE_RUNS if args.save else 1)]
+    results = combine(runs, statistics.median)
+    baseline = json.loads(args.baseline.read_text())["results"] if args.baseline.exists() and not args.save else None
+    regressed = []
+
+    if baseline is None :
+        print(f"{'case':<32}{'us/op':>12}")
+        for key, value in results.items() :
+            print(f"{key:<32}{value:>12.3f}")
+    else :
+        for retry in range(RETRIES + 1) :
+            scale, rows = compare(results, baseline, args.tolerance)
+            if not (regressed := [row[0] for row in rows if row[-1] == "REGRESSED"]) or retry == RETRIES :
+                break
+            # Slow cases get timed again and keep their best run, one slow run is usually the machine
+            runs.append(run(lambda key : key in regressed, args.repeat))
+            results = combine(runs, min)
+
+        print(f"baseline {args.baseline.name}, this machine runs at {1 / scale:.2f}x its speed")
+        print(f"{'case':<32}{'us/op':>12}{'baseline':>12}{'ratio':>8}  status")
+        for key, value, before, ratio, status in rows :
+            before = f"{before:>12.3f}" if before is not None else f"{'-':>12}"
+            ratio = f"{ratio:>8.2f}" if ratio is not None else f"{'-':>8}"
+            print(f"{key:<32}{value:>12.3f}{before}{ratio}  {status}")
+
+    current = {"python": platform.python_version(), "machine": platform.machine(), "unit": "us/op", "results": results}
+    if args.json :
+        write_json(args.json, current)
+
+    if args.save :
+        if args.names and args.baseline.exists() :
+            # Only some cases ran, they join the others in units of the old calibration
+            old = json.loads(args.baseline.read_text())["results"]
+            scale = old["calibration"] / results["calibration"]
+            current["results"] = {**old, **{k: v * scale for k, v in results.items() if k != "calibration"}}
+        write_json(args.baseline, current)
+        print(f"Saved {len(current['results']) - 1} cases to {args.baseline}")
+
+    if regressed :
+        print(f"{len(regressed)} cases regressed more than {args.tolerance:.0%}: {', '.join(regressed)}")
+        if args.check :
+            sys.exit(1)
+
+if __name__ == "__main__" :
+    main()
+
+
+# bk-bot-mkb(benchmark suite), Created by BK Project
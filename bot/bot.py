@@ -1,25 +1,76 @@
 from pathlib import Path
 
-import discord, os
+import discord, os, logging, math, time
 from discord.ext import commands
 
+from .utils import LoopWatchdog, MetricsServer, PrefixCache, Registry, Responder, SelectionManager, load_config
+from .utils import setup_logging, span
+
+log = logging.getLogger("bot")
+
+def gateway_options(config) :
+    messages = config.get("message_commands", True)
+    
+    if not config["lean_gateway"] :
+        intents = discord.Intents.all()
+        intents.messages = messages
+        return {"intents": intents}
+    
+    # Only what the music commands use, no member/presence caching or chunking
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.voice_states = True
+    intents.guild_messages = messages
+    
+    member_cache_flags = discord.MemberCacheFlags.none()
+    member_cache_flags.voice = True
+    
+    return {
+        "intents": intents,
+        "member_cache_flags": member_cache_flags,
+        "chunk_guilds_at_startup": False,
+    }
+
 class BotSetup(commands.Bot) :
     def __init__(self) :
         self._cogs = [p.stem for p in Path(".").glob("./bot/cogs/*.py")]
+        self.config = load_config()
+        self.log_listener = setup_logging(self.config["logging"])
+        self.prefixes = PrefixCache(default=self.config["prefix"])
+        self.dispatch_stats = {"accepted": 0, "rejected": 0}
+        self.responses = Responder()
+        self.selections = SelectionManager(self)
+        self.metrics = Registry()
+        self.metrics_server = MetricsServer(self.metrics, self.config["metrics"]["host"], self.config["metrics"]["port"])
+        self.command_time = self.metrics.histogram("musicbot_command_seconds", "Time spent running a command", ("command",))
+        self.command_errors = self.metrics.counter("musicbot_command_errors_total", "Commands that raised", ("command", "error"))
+        self.gateway_latency = self.metrics.gauge("musicbot_gateway_latency_seconds", "Discord gateway heartbeat latency")
+        self.loop_lag = self.metrics.gauge("musicbot_loop_lag_seconds", "Event loop lag", ("quantile",))
+        self.loop_stalls = self.metrics.counter("musicbot_loop_stalls_total", "Times the event loop was blocked past the threshold")
+        self.metrics.collector(self.collect_metrics)
+        self.watchdog = LoopWatchdog(threshold=self.config["watchdog"]["threshold"])
         super().__init__(
             command_prefix = self.prefix, 
             case_insensitive = True,
-            intents = discord.Intents.all(),
+            **gateway_options(self.config),
             )
 
     def setup(self) :
-        print("Setting Up ...")
+        log.info("Setting Up ...")
         
         for cog in self._cogs :
             self.load_extension(f"bot.cogs.{cog}")
-            print(f" Loaded '{cog}' cog.")
+            log.info("Loaded '%s' cog.", cog)
         
-        print("Setup Complete!")
+        if self.config["watchdog"]["enabled"] :
+            self.loop.create_task(self.watchdog.run())
+            log.info("Watching event loop lag (threshold %.0f ms)", self.watchdog.threshold * 1000)
+        
+        if self.config["metrics"]["enabled"] :
+            self.loop.create_task(self.metrics_server.start())
+            log.info("Serving metrics on %s:%s/metrics", self.metrics_server.host, self.metrics_server.port)
+        
+        log.info("Setup Complete!")
     
     def run(self) :
         self.setup()
@@ -27,33 +78,93 @@ class BotSetup(commands.Bot) :
         with open("bot/data/token.0", "r", encoding="utf-8") as tk :
             TOKEN = tk.read()
         
-        print("Loading bot ... ")
+        log.info("Loading bot ...")
         super().run(TOKEN, reconnect=True)
     
     async def shutdown(self) :
-        print("Shutting down server to discord ...")
+        log.info("Shutting down server to discord ...")
+        self.responses.close()
+        await self.metrics_server.stop()
+        
+        # The last batch of track store writes, cog_unload doesn't run when the bot closes
+        if (music := self.get_cog("Music")) is not None :
+            await music.store.close()
+        
         await super().close()
+        self.log_listener.stop()
     
     async def close(self) :
-        print("Closing on keyboard interrupt ...")
+        log.info("Closing on keyboard interrupt ...")
         await self.shutdown()
     
     async def on_connect(self) :
-        print(f" Connected to discord! (latency : {self.latency*1000:,.0f} ms)")
+        log.info("Connected to discord! (latency : %.0f ms)", self.latency * 1000)
     
     async def on_resumed(self) :
-        print("Bot resumed!")
+        log.info("Bot resumed!")
     
     async def on_disconnect(self) :
-        print("Bot disconnected!")
+        log.warning("Bot disconnected!")
     
     async def on_ready(self) :
+        self.prefixes.set_user(self.user.id)
         self.client_id = (await self.application_info()).id    
         await self.change_presence(activity=discord.Game("and simping"), status = discord.Status.idle)
-        print("Bot is ready :)")
+        log.info("Bot is ready :)")
+    
+    async def on_socket_response(self, msg) :
+        # Select menu picks, interactions arrive without any intent
+        if msg.get("t") == "INTERACTION_CREATE" and msg["d"].get("type") == 3 :
+            await self.selections.resolve(msg["d"])
+    
+    def collect_metrics(self) :
+        if math.isfinite(self.latency) :
+            self.gateway_latency.set(self.latency)
+        
+        lag = self.watchdog.stats()
+        self.loop_lag.set(lag["p50"], quantile="0.5")
+        self.loop_lag.set(lag["p99"], quantile="0.99")
+        self.loop_lag.set(lag["max"], quantile="1")
+        self.loop_stalls.set(lag["stalls"])
+    
+    def observe_command(self, command, elapsed, exc=None) :
+        self.command_time.observe(elapsed, command=command.qualified_name)
+        if exc is not None :
+            self.command_errors.inc(command=command.qualified_name, error=type(getattr(exc, "original", exc)).__name__)
+    
+    def player_node(self, guild) :
+        if guild is None or (music := self.get_cog("Music")) is None :
+            return None
+        
+        return getattr(getattr(music.find_player(guild.id), "node", None), "identifier", None)
+    
+    async def invoke(self, ctx) :
+        if ctx.command is None :
+            return await super().invoke(ctx)
+        
+        started = time.perf_counter()
+        with span(
+            "command", command=ctx.command.qualified_name, guild=getattr(ctx.guild, "id", None),
+            channel=ctx.channel.id, author=ctx.author.id
+        ) as trace :
+            await super().invoke(ctx)
+            # Looked up afterwards, .play may have just created the player
+            if (node := self.player_node(ctx.guild)) is not None :
+                trace.fields["node"] = node
+            if ctx.command_failed :
+                trace.fields["failed"] = True
+        
+        self.observe_command(ctx.command, time.perf_counter() - started)
+    
+    async def on_command_error(self, ctx, exc) :
+        # Overridden rather than listened to, a listener would silence the default traceback
+        if ctx.command is not None :
+            self.command_errors.inc(command=ctx.command.qualified_name, error=type(getattr(exc, "original", exc)).__name__)
+        
+        await super().on_command_error(ctx, exc)
     
     async def prefix(self, bot, msg) :
-        return commands.when_mentioned_or(".")(bot, msg)
+        return list(self.prefixes.matcher(getattr(msg.guild, "id", None)))
     
     async def process_command(self, msg) :
         ctx = await self.get_context(msg, cls=commands.Context)
@@ -62,8 +173,19 @@ class BotSetup(commands.Bot) :
             await self.invoke(ctx)
     
     async def on_message(self, msg) :
-        if not msg.author.bot :
-            await self.process_commands(msg)
+        if msg.author.bot or not self.config["message_commands"] :
+            return
+        
+        if self.prefixes.user_id is None and self.user is not None :
+            self.prefixes.set_user(self.user.id)
+        
+        # Cheap startswith check so non-command messages never build a Context
+        if not self.prefixes.match(getattr(msg.guild, "id", None), msg.content) :
+            self.dispatch_stats["rejected"] += 1
+            return
+        
+        self.dispatch_stats["accepted"] += 1
+        await self.process_commands(msg)
 
 
 # async def on_error(self, err, *args, **kwargs) :
@@ -0,0 +1,92 @@
+import discord
+from discord.ext import commands
+
+import datetime as dt
+import typing as t
+
+class Admin(commands.Cog) :
+    def __init__(self, bot) :
+        self.bot = bot
+
+    async def cog_check(self, ctx) :
+        if isinstance(ctx.channel, discord.DMChannel) :
+            await ctx.send("Something went wrong, try again later!")
+            return False
+        
+        return True
+    
+    @commands.command(name="prefix")
+    @commands.has_permissions(manage_guild=True)
+    async def prefix_command(self, ctx, prefix: t.Optional[str]) :
+        if prefix is None :
+            description = f"The prefix in this server is `{self.bot.prefixes.get(ctx.guild.id)}`"
+        else :
+            await self.bot.prefixes.set(ctx.guild.id, prefix[:5])
+            description = f"Prefix set to `{prefix[:5]}`"
+        
+        await self.bot.responses.info(ctx, description)
+    
+    @prefix_command.error
+    async def prefix_command_error(self, ctx, exc) :
+        if isinstance(exc, commands.MissingPermissions) :
+            await self.bot.responses.error(ctx, "You need the manage server permission to change the prefix!!")
+    
+    @commands.command(name="dispatch")
+    @commands.is_owner()
+    async def dispatch_command(self, ctx) :
+        stats = self.bot.dispatch_stats
+        replies = self.bot.responses.stats()
+        selections = self.bot.selections.stats()
+        total = stats["accepted"] + stats["rejected"]
+        embed = discord.Embed(
+            title = "Message Dispatch",
+            description = (
+                f"Accepted : {stats['accepted']:,}\n"
+                f"Rejected : {stats['rejected']:,}\n"
+                f"Rejected before parsing : {stats['rejected'] / total if total else 0:.1%}\n"
+                f"Replies : {replies['sent']:,} sent, {replies['edited']:,} edited\n"
+                f"Collapsed : {replies['merged']:,} merged, {replies['dropped']:,} dropped\n"
+                f"Pending : {replies['pending']:,} in {replies['channels']:,} channels\n"
+                f"Selections : {selections['picked']:,} picked, {selections['expired']:,} expired, {selections['pending']:,} open\n"
+                f"Selection menu shown in : {selections['ui_time'] * 1000:,.0f} ms"
+            ),
+            colour = ctx.author.colour.blue(),
+            timestamp = dt.datetime.utcnow()
+        )
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.avatar_url)
+        await self.bot.responses.send(ctx, embed)
+    
+    @commands.command(name="diag")
+    @commands.is_owner()
+    async def diag_command(self, ctx) :
+        lag = self.bot.watchdog.stats()
+        embed = discord.Embed(
+            title = "Event Loop",
+            description = (
+                f"Lag : {lag['lag'] * 1000:,.1f} ms now, {lag['p50'] * 1000:,.1f} ms p50, {lag['p99'] * 1000:,.1f} ms p99\n"
+                f"Worst : {lag['max'] * 1000:,.0f} ms\n"
+                f"Stalls over {self.bot.watchdog.threshold * 1000:,.0f} ms : {lag['stalls']:,}"
+            ),
+            colour = ctx.author.colour.blue(),
+            timestamp = dt.datetime.utcnow()
+        )
+        embed.set_author(name="Diagnostics")
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.avatar_url)
+        
+        for stall in list(self.bot.watchdog.stalls)[-3:] :
+            blocked = "still blocked" if stall.duration is None else f"{stall.duration * 1000:,.0f} ms"
+            embed.add_field(
+                name = f"{stall.owner} ({blocked})",
+                value = f"```{stall.stack[-900:]}```",
+                inline = False
+            )
+        
+        await self.bot.responses.send(ctx, embed)
+
+
+def setup(bot) :
+    bot.add_cog(Admin(bot))
+
+
+
+# bk-bot-mkb(Admin Cog), Created by BK Project
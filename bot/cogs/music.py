@@ -1,20 +1,87 @@
 import discord, wavelink
 from discord.ext import commands
 
-import random, asyncio, re
+import random, asyncio, inspect, logging, re, time
 import datetime as dt
 import typing as t
 
+from collections import deque
 from enum import Enum
+from bot.utils import HistoryLog, QueueEntry, TrackCache, TrackList, TrackResolver, TrackStore, TrackView
+from bot.utils import ListenerIndex, PanelBoard, PlayerRegistry, SlashContext, TimerWheel, best_node, classify, node_load, template
+from bot.utils.query import PLAYLIST
+from bot.utils import span, step
 
-URL_REGEX = r"(?i)\b((?:https?://|www\d{0,3}[.]|[a-z0-9.\-]+[.][a-z]{2,4}/)(?:[^\s()<>]+|\(([^\s()<>]+|(\([^\s()<>]+\)))*\))+(?:\(([^\s()<>]+|(\([^\s()<>]+\)))*\)|[^\s`!()\[\]{};:'\".,<>?«»“”‘’]))"
-OPTIONS = {
-    "1️⃣": 0,
-    "2⃣": 1,
-    "3⃣": 2,
-    "4⃣": 3,
-    "5⃣": 4,
-}
+log = logging.getLogger("bot.music")
+
+CHOICES = 5 # Search results offered in the selection menu
+CHOICE_TIMEOUT = 60.0 # Seconds a selection menu waits for a pick
+CACHE_SIZE = 1024 # Number of search results kept in memory
+CACHE_TTL = 6 * 60 * 60 # Seconds before a cached result is searched again
+MAX_NODE_REQUESTS = 4 # Concurrent REST lookups allowed per lavalink node
+STORE_PATH = "bot/data/tracks.db" # Query -> track mappings kept across restarts
+STORE_SIZE = 50000 # Number of queries kept on disk
+STORE_MAX_AGE = 30 * 24 * 60 * 60 # Seconds an unused query is kept on disk
+HISTORY_SIZE = 50 # Played tracks kept in memory per guild (ignored on repeat all)
+HISTORY_PATH = None # Folder for older played tracks, e.g. "bot/data/history"
+NODE_CHECK_INTERVAL = 2 # Seconds between lavalink node health checks
+NODE_RECONNECT_INTERVAL = 10 # Seconds between reconnects to a lavalink node wavelink gave up on
+INGEST_CHUNK = 100 # Playlist tracks queued per step while loading in the background
+INGEST_PROGRESS = 2 # Seconds between playlist progress message edits
+SWEEP_INTERVAL = 60 # Seconds between idle player sweeps
+PANEL_INTERVAL = 10 # Seconds between now playing panel refreshes
+PANEL_EDITS = 20 # Panel edits allowed per refresh, across all guilds
+PANEL_BAR = 20 # Cells in the panel progress bar
+QUEUE_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 1000, 5000) # Upper bounds of the queue length gauge
+BULK_MAX = 50 # Queries accepted by a single .play
+BULK_CONCURRENCY = 4 # Lookups of one bulk .play running at once
+BULK_FILE_SIZE = 64 * 1024 # Largest query list read from an attached .txt file
+BULK_FAILED_SHOWN = 10 # Failed queries listed in the summary
+
+def split_queries(text) :
+    # One query per line or per ';', e.g. ".play song a; song b"
+    return [q for q in (q.strip().strip("<>") for q in re.split(r"[\n;]", text)) if q]
+
+def choices_embed(author, tracks) :
+    embed = discord.Embed(
+        title = "Choose the song",
+        description = (
+            "\n".join(
+                f"**{i+1}.** {t.title} ({t.length//60000}:{str(t.length%60).zfill(2)})"
+                for i,t in enumerate(tracks[:CHOICES])
+            )
+        ),
+        colour = author.colour,
+        timestamp = dt.datetime.utcnow()
+    )
+    embed.set_author(name="Query results")
+    embed.set_footer(text=f"Requested by {author.display_name}", icon_url=author.avatar_url)
+    return embed
+
+def queue_embed(author, queue, show) :
+    embed = discord.Embed(
+        title = "Queue List",
+        description = 
+            f"Showing up to next {show} tracks\n"
+            f"Note! if the bot have bug, you can use 'stop' command and play again"
+            ,
+        colour = author.colour.blue(),
+        timestamp = dt.datetime.utcnow()
+    )
+    embed.set_author(name="Query Results")
+    embed.set_footer(text=f"Requested by {author.display_name}", icon_url=author.avatar_url)
+    embed.add_field(
+        name="Currently playing", 
+        value=getattr(queue.current_track, "title", "No tracks currently playing."), 
+        inline=False
+    )
+    if upcoming := queue.upcoming :
+        embed.add_field(
+            name="Next up",
+            value="\n - ".join(t.title for t in upcoming[:show]),
+            inline=False
+        )
+    return embed
 
 # Commands Error Check Exception
 class AlreadyConnectedToChannel(commands.CommandError) :
@@ -59,6 +126,15 @@ class NotConnected(commands.CommandError) :
 class NoTracksInQueue(commands.CommandError) :
     pass
 
+class TooManyPlayers(commands.CommandError) :
+    pass
+
+class NoLivePanel(commands.CommandError) :
+    pass
+
+class TooManyQueries(commands.CommandError) :
+    pass
+
 class RepeatMode(Enum) :
     NONE = 0
     ONE = 1
@@ -67,10 +143,12 @@ class RepeatMode(Enum) :
 
 # Main Classes and Objects
 class Queue :
-    def __init__(self) :
-        self._queue = []
+    def __init__(self, history_size=HISTORY_SIZE, spill=None) :
+        self._queue = TrackList()
         self.position = 0
         self.repeat_mode = RepeatMode.NONE
+        self.history_size = history_size
+        self.spill = spill
         
     @property
     def is_empty(self) :
@@ -96,27 +174,45 @@ class Queue :
         if not self._queue :
             raise QueueIsEmpty
         
-        return self._queue[self.position + 1:]
+        return TrackView(self._queue, self.position + 1)
     
     @property
     def history(self) :
         if not self._queue :
             raise QueueIsEmpty
         
-        return self._queue[:self.position]
+        return TrackView(self._queue, 0, self.position)
 
     @property
     def length(self) :
         return len(self._queue)
 
     def add(self, *args) :
-        self._queue.extend(args)
+        self._queue.extend(map(QueueEntry.from_track, args))
+    
+    def insert(self, index, track) :
+        self._queue.insert(index, QueueEntry.from_track(track))
+        
+        if index <= self.position :
+            self.position += 1
+    
+    def remove(self, index) :
+        track = self._queue.pop(index)
+        
+        if index < self.position :
+            self.position -= 1
+        
+        return track
+    
+    def move(self, src, dst) :
+        self.insert(dst, self.remove(src))
     
     def get_next_track(self) :
         if not self._queue :
             raise QueueIsEmpty
         
         self.position += 1
+        self.trim_history()
         
         if self.position < 0 :
             return None
@@ -124,17 +220,41 @@ class Queue :
             if self.repeat_mode == RepeatMode.ALL :
                 self.position = 0
             else :
+                # Stays one past the end, so a late end event can't push the next added track out of reach
+                self.position = len(self._queue)
                 return None
         
         return self._queue[self.position]
     
+    def peek_next(self) :
+        if not self._queue :
+            return None
+        
+        if self.repeat_mode == RepeatMode.ONE :
+            return self.current_track
+        
+        if 0 <= self.position + 1 <= len(self._queue) - 1 :
+            return self._queue[self.position + 1]
+        elif self.repeat_mode == RepeatMode.ALL :
+            return self._queue[0]
+    
+    def trim_history(self) :
+        if self.repeat_mode == RepeatMode.ALL or (excess := self.position - self.history_size) <= 0 :
+            return
+        
+        played = self._queue.trim(excess)
+        self.position -= len(played)
+        
+        if self.spill is not None :
+            self.spill.write(played)
+    
     def shuffle(self) :
         if not self._queue :
             raise QueueIsEmpty
         
-        upcoming = self.upcoming
+        upcoming = list(self.upcoming)
         random.shuffle(upcoming)
-        self._queue = self._queue[:self.position + 1]
+        self._queue.truncate(self.position + 1)
         self._queue.extend(upcoming)
     
     def set_repeat_mode(self, mode) :
@@ -154,7 +274,16 @@ class Queue :
 class Player(wavelink.Player) :
     def __init__(self, *args, **kwargs) :
         super().__init__(*args, **kwargs)
-        self.queue = Queue()
+        self.queue = Queue(
+            spill = HistoryLog(f"{HISTORY_PATH}/{self.guild_id}.log") if HISTORY_PATH else None
+        )
+        self.migrations = deque(maxlen=20)
+        self.gaps = deque(maxlen=50)
+        self.prepared = None
+        self.loaders = set()
+        self._ended_at = None
+        self._started_at = None
+        self._play_sent = None
     
     async def connect(self, ctx, channel=None) :
         if self.is_connected :
@@ -166,114 +295,345 @@ class Player(wavelink.Player) :
         await super().connect(channel.id)
         return channel
             
+    async def migrate(self, node) :
+        started = time.perf_counter()
+        # change_node replays the voice state, current track at its position, pause and volume
+        await self.change_node(node.identifier)
+        
+        self.migrations.append(elapsed := (time.perf_counter() - started) * 1000)
+        return elapsed
+    
+    async def restore(self) :
+        # A restarted node has forgotten the player, replays what change_node would on a new one,
+        # from the last position the node reported rather than the wall clock of the outage
+        if self._voice_state :
+            await self._dispatch_voice_update()
+        
+        if self.current :
+            await self.node._send(op="play", guildId=str(self.guild_id), track=self.current.id, startTime=int(self.last_position))
+            self.last_update = time.time() * 1000
+            
+            if self.paused :
+                await self.node._send(op="pause", guildId=str(self.guild_id), pause=self.paused)
+        
+        if self.volume != 100 :
+            await self.node._send(op="volume", guildId=str(self.guild_id), volume=self.volume)
+    
     async def teardown(self) :
+        self.cancel_ingest()
+        
         try :
             await self.destroy()
         except KeyError :
             pass
     
+    def start_ingest(self, ctx, tracks, start=0, skip=None) :
+        # Playlists load side by side, only stop, teardown and eviction cancel them
+        self.loaders.add(task := asyncio.ensure_future(self.ingest(ctx, tracks, start, skip)))
+        task.add_done_callback(self.ingest_done)
+    
+    def ingest_done(self, task) :
+        self.loaders.discard(task)
+        
+        # The user was told in the progress message, the traceback goes to the log
+        if not task.cancelled() and (exc := task.exception()) is not None :
+            log.error("Playlist loading failed in guild %s", self.guild_id, exc_info=exc)
+    
+    def cancel_ingest(self) :
+        for task in self.loaders :
+            task.cancel()
+        
+        self.loaders.clear()
+    
+    async def ingest(self, ctx, tracks, start=0, skip=None) :
+        embed = discord.Embed(
+            title = "Information",
+            description = "Loading playlist ...",
+            colour = ctx.author.colour.blue()
+        )
+        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
+        msg = await self.bot.responses.send(ctx, embed)
+        added, edited = start, time.monotonic()
+        
+        try :
+            if inspect.isawaitable(tracks) :
+                tracks = await tracks
+            
+            if isinstance(tracks, wavelink.TrackPlaylist) :
+                name, tracks = tracks.data.get("playlistInfo", {}).get("name", "playlist"), tracks.tracks
+            else :
+                name, tracks = "playlist", tracks or []
+            
+            pending = [t for t in tracks[start:] if skip is None or t.identifier != skip]
+            total = start + len(pending)
+            
+            for i in range(0, len(pending), INGEST_CHUNK) :
+                self.queue.add(*(chunk := pending[i:i + INGEST_CHUNK]))
+                added += len(chunk)
+                
+                if not self.is_playing and not self.queue.is_empty :
+                    await self.start_playback()
+                
+                if added < total and time.monotonic() - edited > INGEST_PROGRESS :
+                    embed.description = f"Loading `{name}` ... ({added:,}/{total:,} tracks)"
+                    await msg.edit(embed=embed)
+                    edited = time.monotonic()
+                
+                await asyncio.sleep(0)
+            
+            embed.description = f"Added {added:,} tracks from `{name}` to queue!"
+            await msg.edit(embed=embed)
+        
+        except asyncio.CancelledError :
+            embed.description = f"Playlist loading cancelled after {added:,} tracks!"
+            embed.colour = ctx.author.colour.red()
+            await msg.edit(embed=embed)
+            raise
+        
+        except Exception :
+            embed.description = f"Couldn't load the rest of the playlist ({added:,} tracks added)!!"
+            embed.colour = ctx.author.colour.red()
+            await msg.edit(embed=embed)
+            raise
+    
     async def add_tracks(self, ctx, tracks) :
         if not tracks :
             raise NoTracksFound
         
         if isinstance(tracks, wavelink.TrackPlaylist) :
-            self.queue.add(*tracks.tracks)
+            # Queue the first tracks now so playback starts, the rest follow in the background
+            self.queue.add(*tracks.tracks[:INGEST_CHUNK])
+            if len(tracks.tracks) > INGEST_CHUNK :
+                self.start_ingest(ctx, tracks, start=INGEST_CHUNK)
         elif len(tracks) == 1 :
             self.queue.add(tracks[0])
-            embed = discord.Embed(
-                title = "Information",
-                description = f"Added `{tracks[0].title}` to queue!",
-                colour = ctx.author.colour.blue()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.info(ctx, f"Added `{tracks[0].title}` to queue!")
         else :
             if (track := await self.choose_track(ctx, tracks)) is not None:
                 self.queue.add(track)
-                embed = discord.Embed(
-                    title = "Information",
-                    description = f"Added `{track.title}` to the queue!",
-                    colour = ctx.author.colour.blue()
-                )
-                embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-                await ctx.send(embed=embed)
+                await self.bot.responses.info(ctx, f"Added `{track.title}` to the queue!")
         
         if not self.is_playing and not self.queue.is_empty :
             await self.start_playback()
     
     async def choose_track(self, ctx, tracks) :
-        def _check(r, u) :
-            return (
-                r.emoji in OPTIONS.keys()
-                and u == ctx.author
-                and r.message.id == msg.id
-            )
+        embed = choices_embed(ctx.author, tracks)
         
-        embed = discord.Embed(
-            title = "Choose the song",
-            description = (
-                "\n".join(
-                    f"**{i+1}.** {t.title} ({t.length//60000}:{str(t.length%60).zfill(2)})"
-                    for i,t in enumerate(tracks[:5])
-                )
-            ),
-            colour = ctx.author.colour,
-            timestamp = dt.datetime.utcnow()
-        )
-        embed.set_author(name="Query results")
-        embed.set_footer(text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.avatar_url)
+        # One request shows every choice, the pick comes back as an interaction
+        labels = [f"{i+1}. {t.title}" for i, t in enumerate(tracks[:CHOICES])]
+        if (index := await self.bot.selections.choose(ctx, embed, labels, CHOICE_TIMEOUT)) is None :
+            if ctx.message is not None :
+                await ctx.message.delete()
+            return None
         
-        msg = await ctx.send(embed=embed)
-        for emoji in list(OPTIONS.keys())[:min(len(tracks), len(OPTIONS))] :
-            await msg.add_reaction(emoji)
+        return tracks[index]
+    
+    async def play(self, track, **kwargs) :
+        if isinstance(track, QueueEntry) :
+            track = track.build()
         
-        try :
-            reaction, _ = await self.bot.wait_for("reaction_add", timeout=60.0, check=_check)
-        except asyncio.TimeoutError :
-            await msg.delete()
-            await ctx.message.delete()
-        else :
-            await msg.delete()
-            return tracks[OPTIONS[reaction.emoji]]
+        self._play_sent = time.perf_counter()
+        with step("lavalink") :
+            await super().play(track, **kwargs)
     
     async def start_playback(self) :
+        # Playback starting from idle, the time since the last track ended isn't a gap between tracks
+        self._ended_at = None
         await self.play(self.queue.current_track)
     
+    def prepare(self) :
+        # Build the next track while this one plays, so advancing is a single send
+        if (entry := self.queue.peek_next()) is None or not getattr(entry, "id", None) :
+            self.prepared = None
+        else :
+            self.prepared = (entry, entry.build() if isinstance(entry, QueueEntry) else entry)
+    
+    def take_prepared(self, entry) :
+        prepared, self.prepared = self.prepared, None
+        
+        if prepared is not None and prepared[0] is entry :
+            return prepared[1]
+        
+        return entry
+    
+    def track_ended(self) :
+        self._ended_at = time.perf_counter()
+    
+    def track_started(self) :
+        # Returns seconds from the play send and from the previous track's end, when known
+        now, latency, gap = time.perf_counter(), None, None
+        self._started_at = time.time() * 1000
+        
+        if self._play_sent is not None :
+            latency, self._play_sent = now - self._play_sent, None
+        
+        if self._ended_at is not None :
+            gap, self._ended_at = now - self._ended_at, None
+            self.gaps.append(gap * 1000)
+        
+        self.prepare()
+        return latency, gap
+    
+    @property
+    def average_gap(self) :
+        return sum(self.gaps) / len(self.gaps) if self.gaps else 0.0
+    
+    @property
+    def live_position(self) :
+        if (track := self.queue.current_track) is None or not self.is_playing :
+            return 0
+        
+        # Lavalink only reports the position every few seconds, fill the gap with the wall clock
+        if self.last_update :
+            position = self.last_position if self.paused else self.last_position + time.time() * 1000 - self.last_update
+        elif self._started_at is not None and not self.paused :
+            position = time.time() * 1000 - self._started_at
+        else :
+            position = 0
+        
+        return max(0, min(int(position), track.length))
+    
     async def advance(self) :
         try :
             if (track := self.queue.get_next_track()) is not None :
-                await self.play(track)
+                return await self.play(self.take_prepared(track))
         except QueueIsEmpty :
             pass
+        
+        # Nothing follows, e.g. the end of the queue or .stop, so no gap is measured
+        self._ended_at = None
     
     async def repeat_track(self) :
-        await self.play(self.queue.current_track)
+        await self.play(self.take_prepared(self.queue.current_track))
 
 class Music(commands.Cog, wavelink.WavelinkMixin) :
     def __init__(self, bot) :
         self.bot = bot
         self.wavelink = wavelink.Client(bot=bot)
+        self.cache = TrackCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+        self.store = TrackStore(STORE_PATH, maxsize=STORE_SIZE, max_age=STORE_MAX_AGE)
+        self.resolver = TrackResolver(self.wavelink, self.cache, self.store, max_requests=MAX_NODE_REQUESTS)
+        self.listeners = ListenerIndex()
+        self.timers = TimerWheel()
+        self.reconnects = {}
+        self.registry = PlayerRegistry(
+            max_players = bot.config["max_players"],
+            idle_timeout = bot.config["player_idle_timeout"],
+            placeholder_timeout = bot.config["placeholder_timeout"],
+        )
+        self.panels = PanelBoard(max_edits=PANEL_EDITS)
+        self.timers.schedule("sweep", SWEEP_INTERVAL, self.sweep_players)
+        self.timers.schedule("panels", PANEL_INTERVAL, self.update_panels)
         self.bot.loop.create_task(self.start_nodes())
+        self.bot.loop.create_task(self.watch_nodes())
+        self._timer_task = self.bot.loop.create_task(self.timers.run())
         self.bot.remove_command("help")
+        
+        metrics = bot.metrics
+        self.lookup_time = metrics.histogram("musicbot_get_tracks_seconds", "Time to resolve a query into tracks")
+        self.cache_lookups = metrics.counter("musicbot_track_cache_lookups_total", "Track cache lookups", ("result",))
+        self.cache_ratio = metrics.gauge("musicbot_track_cache_hit_ratio", "Share of track cache lookups that hit")
+        self.store_lookups = metrics.counter("musicbot_track_store_lookups_total", "Track store lookups", ("result",))
+        self.node_up = metrics.gauge("musicbot_node_available", "Whether a lavalink node is usable", ("node",))
+        self.player_count = metrics.gauge("musicbot_players", "Players per node by state", ("node", "state"))
+        self.queue_length = metrics.gauge("musicbot_queue_length_players", "Players with at most le upcoming tracks", ("le",))
+        self.start_time = metrics.histogram("musicbot_track_start_seconds", "Time from play request to track start")
+        self.gap_time = metrics.histogram("musicbot_track_gap_seconds", "Silence between one track ending and the next starting")
+        metrics.collector(self.collect_metrics)
+    
+    def cog_unload(self) :
+        self.bot.metrics.remove_collector(self.collect_metrics)
+        self._timer_task.cancel()
+        self.bot.loop.create_task(self.store.close())
     
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after) :
-        if not member.bot and after.channel is None :
-            if not [m for m in before.channel.members if not m.bot] :
-                await self.get_player(member.guild).teardown()
+        if member.id == self.bot.user.id :
+            if before.channel is not None :
+                self.listeners.untrack(before.channel.id)
+            
+            if after.channel is not None :
+                # voice_states doesn't need the member cache, members we don't have cached count as listeners
+                self.listeners.track(after.channel.id, (
+                    uid for uid in after.channel.voice_states
+                    if uid != member.id and not getattr(member.guild.get_member(uid), "bot", False)
+                ))
+                self.check_listeners(member.guild, after.channel.id)
+            else :
+                self.timers.cancel(member.guild.id)
+        
+        elif not member.bot :
+            for channel_id in self.listeners.move(
+                member.id, getattr(before.channel, "id", None), getattr(after.channel, "id", None)
+            ) :
+                self.check_listeners(member.guild, channel_id)
+    
+    def check_listeners(self, guild, channel_id) :
+        if self.listeners.is_empty(channel_id) :
+            self.timers.schedule(guild.id, self.bot.config["empty_channel_timeout"], self.leave_empty, guild.id, channel_id)
+        else :
+            self.timers.cancel(guild.id)
+    
+    async def leave_empty(self, guild_id, channel_id) :
+        if (player := self.find_player(guild_id)) is None or player.channel_id != channel_id :
+            return
+        
+        if channel_id in self.listeners and self.listeners.is_empty(channel_id) :
+            await player.teardown()
     
     @wavelink.WavelinkMixin.listener()
     async def on_node_ready(self, node) :
-        print(f"Wavelink node '{node.identifier}' ready!")
+        log.info("Wavelink node '%s' ready!", node.identifier)
+        
+        # Players still bound to it had no other node to move to, e.g. a single node restarting
+        if node.players :
+            await self.recover(node)
+    
+    @wavelink.WavelinkMixin.listener("on_track_start")
+    async def on_player_start(self, node, payload) :
+        with span("TrackStart", guild=payload.player.guild_id, node=node.identifier) as trace :
+            self.registry.touch(payload.player.guild_id)
+            latency, gap = payload.player.track_started()
+            
+            if latency is not None :
+                self.start_time.observe(latency)
+                trace.fields["start_latency_ms"] = round(latency * 1000, 2)
+            if gap is not None :
+                self.gap_time.observe(gap)
+                trace.fields["gap_ms"] = round(gap * 1000, 2)
     
     @wavelink.WavelinkMixin.listener("on_track_stuck")
     @wavelink.WavelinkMixin.listener("on_track_end")
     @wavelink.WavelinkMixin.listener("on_track_exception")
     async def on_player_stop(self, node, payload) :
-        if payload.player.queue.repeat_mode == RepeatMode.ONE :
-            await payload.player.repeat_track()
-        else :
-            await payload.player.advance()
+        with span(
+            type(payload).__name__, guild=payload.player.guild_id, node=node.identifier,
+            reason=getattr(payload, "reason", None), exception=getattr(payload, "error", None)
+        ) :
+            self.registry.touch(payload.player.guild_id)
+            
+            # Lavalink ends a failed track with LOAD_FAILED and a replaced one with REPLACED,
+            # advancing on those too would skip a track or run past the end of the queue
+            if isinstance(payload, wavelink.TrackException) or getattr(payload, "reason", None) == "REPLACED" :
+                return
+            
+            payload.player.track_ended()
+            
+            if payload.player.queue.repeat_mode == RepeatMode.ONE :
+                await payload.player.repeat_track()
+            else :
+                await payload.player.advance()
+    
+    async def cog_command_error(self, ctx, exc) :
+        if isinstance(exc, TooManyPlayers) :
+            await self.bot.responses.error(ctx, "The bot is busy in too many servers, try again later!!")
+        
+        # Overriding this skips discord.py's default handler, so bugs and errors
+        # no command handler answers are logged here instead of dropped, slash commands log their own
+        elif isinstance(ctx, commands.Context) and (
+            isinstance(exc, commands.CommandInvokeError) or not ctx.command.has_error_handler()
+        ) :
+            log.error("Ignoring exception in command %s", ctx.command, exc_info=exc)
     
     async def cog_check(self, ctx) :
         if isinstance(ctx.channel, discord.DMChannel) :
@@ -286,71 +646,316 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
     async def start_nodes(self) :
         await self.bot.wait_until_ready()
         
-        nodes = {
-           "MAIN" : {
-               "host": "127.0.0.1",
-               "port": 2333,
-               "rest_uri": "http://127.0.0.1:2333",
-               "password": "bkserverlink",
-               "identifier": "MAIN",
-               "region": "singapore",
-           } 
-        }
-        # This node is from lavalink.jar(with application.yml)
-        # you can find it in jdk inside bin folder
-        
-        for node in nodes.values() : 
-            await self.wavelink.initiate_node(**node)
+        # Nodes are read from bot/data/config.json, the default one is
+        # lavalink.jar(with application.yml) running next to the bot
+        await asyncio.gather(*(self.wavelink.initiate_node(**node) for node in self.bot.config["nodes"]))
+    
+    async def watch_nodes(self) :
+        await self.bot.wait_until_ready()
+        
+        while not self.bot.is_closed() :
+            await asyncio.sleep(NODE_CHECK_INTERVAL)
+            
+            for node in list(self.wavelink.nodes.values()) :
+                if not node.is_available and node.players :
+                    await self.failover(node)
+                
+                await self.reconnect(node)
+    
+    async def failover(self, node) :
+        healthy = [n for n in self.wavelink.nodes.values() if n is not node]
+        
+        if (target := best_node(healthy, node.region)) is None :
+            log.error("Wavelink node '%s' is down, no node to move %d players to!", node.identifier, len(node.players))
+            return
+        
+        players = list(node.players.values())
+        results = await asyncio.gather(*(p.migrate(target) for p in players), return_exceptions=True)
+        
+        for player, result in zip(players, results) :
+            if isinstance(result, Exception) :
+                log.error("Failed to move player %s to '%s' : %r", player.guild_id, target.identifier, result)
+            else :
+                log.info("Moved player %s from '%s' to '%s' (%.0f ms)", player.guild_id, node.identifier, target.identifier, result)
+    
+    async def reconnect(self, node) :
+        ws = node._websocket
+        
+        # wavelink's listener dies on the close frame of a restarting lavalink and never retries,
+        # a dead one is replaced here so the node and its players come back with lavalink
+        if ws.is_connected or ws._task is None or not ws._task.done() :
+            return
+        
+        if time.monotonic() < self.reconnects.get(node.identifier, 0) :
+            return
+        
+        self.reconnects[node.identifier] = time.monotonic() + NODE_RECONNECT_INTERVAL
+        if not ws._task.cancelled() and (exc := ws._task.exception()) is not None :
+            log.warning("Wavelink node '%s' listener stopped (%r), reconnecting", node.identifier, exc)
+        
+        ws._task = None
+        await ws._connect()
+    
+    async def recover(self, node) :
+        players = list(node.players.values())
+        results = await asyncio.gather(*(p.restore() for p in players), return_exceptions=True)
+        
+        for player, result in zip(players, results) :
+            if isinstance(result, Exception) :
+                log.error("Failed to restore player %s on '%s' : %r", player.guild_id, node.identifier, result)
+        
+        log.info("Restored %d players on reconnected node '%s'", len(players), node.identifier)
+    
+    async def get_tracks(self, query) :
+        started = time.perf_counter()
+        try :
+            with step("lavalink") :
+                return await self.resolver.get_tracks(query)
+        finally :
+            self.lookup_time.observe(time.perf_counter() - started)
+    
+    def collect_metrics(self) :
+        self.cache_lookups.set(self.cache.hits, result="hit")
+        self.cache_lookups.set(self.cache.misses, result="miss")
+        self.cache_ratio.set(self.cache.hit_rate)
+        self.store_lookups.set(self.store.hits, result="hit")
+        self.store_lookups.set(self.store.misses, result="miss")
+        
+        self.player_count.clear()
+        for node in self.wavelink.nodes.values() :
+            self.node_up.set(int(node.is_available), node=node.identifier)
+            
+            connected = [p for p in node.players.values() if p.is_connected]
+            playing = sum(p.is_playing for p in connected)
+            self.player_count.set(len(connected), node=node.identifier, state="active")
+            self.player_count.set(playing, node=node.identifier, state="playing")
+            self.player_count.set(len(connected) - playing, node=node.identifier, state="idle")
+        
+        # Gauges of the current distribution, a histogram reset every scrape would break rate()
+        lengths = [max(p.queue.length - p.queue.position - 1, 0) for p in self.all_players()]
+        for bound in QUEUE_BUCKETS :
+            self.queue_length.set(sum(n <= bound for n in lengths), le=bound)
+        self.queue_length.set(len(lengths), le="+Inf")
+    
+    async def load_query(self, query) :
+        tracks = await self.get_tracks(query.target)
+        
+        # Empty searches move on to the next provider
+        for fallback in query.fallbacks :
+            if tracks :
+                break
+            tracks = await self.get_tracks(fallback)
+        
+        return tracks
+    
+    async def attached_queries(self, ctx) :
+        for attachment in getattr(ctx.message, "attachments", []) :
+            if attachment.filename.lower().endswith(".txt") and attachment.size <= BULK_FILE_SIZE :
+                return split_queries((await attachment.read()).decode("utf-8", "replace"))
+        
+        return []
+    
+    async def resolve_bulk(self, queries) :
+        semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+        
+        async def lookup(query) :
+            async with semaphore :
+                try :
+                    return await self.load_query(classify(query))
+                except wavelink.ZeroConnectedNodes :
+                    raise
+                except Exception :
+                    return None
+        
+        # gather keeps the input order whatever order the lookups finish in
+        return await asyncio.gather(*(lookup(q) for q in queries))
+    
+    async def play_bulk(self, ctx, player, queries) :
+        if len(queries) > BULK_MAX :
+            raise TooManyQueries
+        
+        added, failed = 0, []
+        for query, tracks in zip(queries, await self.resolve_bulk(queries)) :
+            if not tracks :
+                failed.append(query)
+                continue
+            
+            tracks = tracks.tracks if isinstance(tracks, wavelink.TrackPlaylist) else tracks[:1]
+            player.queue.add(*tracks)
+            added += len(tracks)
+        
+        if not player.is_playing and not player.queue.is_empty :
+            await player.start_playback()
+        
+        embed = template(
+            ctx, f"Added {added:,} tracks from {len(queries) - len(failed):,}/{len(queries):,} queries to queue!",
+            error = not added
+        )
+        if failed :
+            embed.add_field(
+                name = f"Not found ({len(failed):,})",
+                value = "\n".join(f"`{q[:80]}`" for q in failed[:BULK_FAILED_SHOWN]) + (
+                    f"\n... and {len(failed) - BULK_FAILED_SHOWN:,} more" if len(failed) > BULK_FAILED_SHOWN else ""
+                ),
+                inline = False
+            )
+        await self.bot.responses.send(ctx, embed)
+    
+    def find_player(self, guild_id) :
+        for node in self.wavelink.nodes.values() :
+            if (player := node.players.get(guild_id)) is not None :
+                return player
     
     def get_player(self, obj) :
-        if isinstance(obj, commands.Context) :
-            return self.wavelink.get_player(obj.guild.id, cls=Player, context=obj)
+        if isinstance(obj, (commands.Context, SlashContext)) :
+            guild, kwargs = obj.guild, {"context": obj}
         elif isinstance(obj, discord.Guild) :
-            return self.wavelink.get_player(obj.id, cls=Player)
+            guild, kwargs = obj, {}
+        else :
+            return None
+        
+        self.registry.touch(guild.id)
+        
+        if (player := self.find_player(guild.id)) is not None :
+            return player
+        
+        if len(players := self.all_players()) >= self.registry.max_players :
+            for player in self.registry.overflow(players) :
+                self.evict_player(player)
+            
+            if len(self.all_players()) >= self.registry.max_players :
+                raise TooManyPlayers
+        
+        node = best_node(self.wavelink.nodes.values(), getattr(guild, "region", None))
+        return self.wavelink.get_player(guild.id, cls=Player, node_id=getattr(node, "identifier", None), **kwargs)
+    
+    def all_players(self) :
+        return [p for node in self.wavelink.nodes.values() for p in node.players.values()]
+    
+    def evict_player(self, player) :
+        player.cancel_ingest()
+        player.node.players.pop(player.guild_id, None)
+        self.registry.forget(player.guild_id)
+        self.registry.evicted += 1
+    
+    async def sweep_players(self) :
+        try :
+            for player in self.registry.expired(self.all_players()) :
+                if player.is_connected :
+                    await player.teardown()
+                    self.registry.forget(player.guild_id)
+                    self.registry.evicted += 1
+                else :
+                    self.evict_player(player)
+        finally :
+            self.bot.responses.prune()
+            self.timers.schedule("sweep", SWEEP_INTERVAL, self.sweep_players)
+    
+    async def update_panels(self) :
+        try :
+            await self.panels.tick()
+        finally :
+            self.timers.schedule("panels", PANEL_INTERVAL, self.update_panels)
+    
+    def render_panel(self, guild_id, author) :
+        if (player := self.find_player(guild_id)) is None or not player.is_connected :
+            return None
+        
+        embed = discord.Embed(title = "Now Playing", colour = author.colour.blue())
+        embed.set_author(name="Live Playback")
+        embed.set_footer(text = f"Live panel by {author.display_name}", icon_url = author.avatar_url)
+        
+        # current_track raises on an empty queue, which is where .stop leaves a live panel
+        if player.queue.is_empty or not player.is_playing or (track := player.queue.current_track) is None :
+            embed.description = "Nothing is playing right now"
+            return embed
+        
+        # Rounded to the refresh interval, so a paused player renders the same and isn't edited
+        position = player.live_position // (PANEL_INTERVAL * 1000) * PANEL_INTERVAL * 1000
+        cell = min(position * PANEL_BAR // max(track.length, 1), PANEL_BAR - 1)
+        
+        embed.add_field(name = "Track title", value = track.title, inline = False)
+        embed.add_field(name = "Artist", value = track.author, inline = False)
+        embed.add_field(
+            name = "Paused" if player.is_paused else "Position",
+            value = (
+                f"{'▬' * cell}🔘{'▬' * (PANEL_BAR - cell - 1)}\n"
+                f"{position // 60000}:{position // 1000 % 60:02}/{track.length // 60000}:{track.length // 1000 % 60:02}"
+            ),
+            inline = False
+        )
+        if next_track := player.queue.peek_next() :
+            embed.add_field(name = "Next up", value = next_track.title, inline = False)
+        
+        return embed
+    
+    @commands.command(name="nodes")
+    @commands.is_owner()
+    async def nodes_command(self, ctx) :
+        embed = discord.Embed(
+            title = "Lavalink Nodes",
+            colour = ctx.author.colour.blue(),
+            timestamp = dt.datetime.utcnow()
+        )
+        embed.set_author(name="Node Load")
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.avatar_url)
+        
+        for load in map(node_load, self.wavelink.nodes.values()) :
+            embed.add_field(
+                name = f"{load['identifier']} ({load['region']})",
+                value = (
+                    f"{'Available' if load['available'] else 'Unavailable'}\n"
+                    f"Players : {load['connected']} connected / {load['players']} total, {load['playing']} playing\n"
+                    f"CPU : {load['system_load']:.0%} system, {load['lavalink_load']:.0%} lavalink\n"
+                    f"Frames : {load['frames_deficit']} deficit, {load['frames_nulled']} nulled\n"
+                    f"Penalty : {load['penalty']:,.1f}"
+                ),
+                inline = False
+            )
+        
+        await self.bot.responses.send(ctx, embed)
+    
+    @commands.command(name="players")
+    @commands.is_owner()
+    async def players_command(self, ctx) :
+        stats = self.registry.stats(self.all_players())
+        embed = discord.Embed(
+            title = "Players",
+            description = (
+                f"Total : {stats['total']:,} / {self.registry.max_players:,}\n"
+                f"Connected : {stats['connected']:,} ({stats['playing']:,} playing)\n"
+                f"Placeholders : {stats['placeholders']:,}\n"
+                f"Queued tracks : {stats['queued']:,}\n"
+                f"Evicted : {stats['evicted']:,}\n"
+                f"Live panels : {len(self.panels):,} ({self.panels.edits:,} edits, {self.panels.skipped:,} unchanged)\n"
+                f"Memory : ~{stats['memory'] / 1024:,.0f} KiB"
+            ),
+            colour = ctx.author.colour.blue(),
+            timestamp = dt.datetime.utcnow()
+        )
+        embed.set_author(name="Player Registry")
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.avatar_url)
+        await self.bot.responses.send(ctx, embed)
     
     @commands.command(name="connect", aliases=["join", "con"])
     async def connect_command(self, ctx, *, channel: t.Optional[discord.VoiceChannel]) :
         player = self.get_player(ctx)
         channel = await player.connect(ctx, channel)
-        embed = discord.Embed(
-            title = "Information",
-            description = f"Connected to {channel.name}!",
-            colour = ctx.author.colour.blue()
-        )
-        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-        await ctx.send(embed=embed)
+        await self.bot.responses.info(ctx, f"Connected to {channel.name}!")
     
     @connect_command.error
     async def connect_command_error(self, ctx, exc) :
         if isinstance(exc, AlreadyConnectedToChannel) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "The bot is already connected in channel!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "The bot is already connected in channel!!")
 
         elif isinstance(exc, NoVoiceChannel) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "No suitable voice channel was provided!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "No suitable voice channel was provided!!")
     
     @commands.command(name="disconnect", aliases=["leave", "lv", "dc"])
     async def disconnect_command(self, ctx) :
         player = self.get_player(ctx)
         await player.teardown()
-        embed = discord.Embed(
-            title = "Information",
-            description = "The bot is disconnected!!",
-            colour = ctx.author.colour.blue()
-        )
-        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-        await ctx.send(embed=embed)
+        await self.bot.responses.info(ctx, "The bot is disconnected!!")
     # in this code, disconnect is equal to teardown
     
     @commands.command(name="play", aliases=["p", "Assalamualaikum"])
@@ -360,45 +965,49 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
         if not player.is_connected :
             await player.connect(ctx)
         
+        # Several queries at once, or a .txt file of them, are looked up together
+        queries = split_queries(query) if query is not None else await self.attached_queries(ctx)
+        if len(queries) > 1 or (query is None and queries) :
+            return await self.play_bulk(ctx, player, queries)
+        
         if query is None :
             if player.queue.is_empty :
                 raise QueueIsEmpty
             
             await player.set_pause(False)
-            embed = discord.Embed(
-                title = "Information",
-                description = "Song Resumed!",
-                colour = ctx.author.colour.blue()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.info(ctx, "Song Resumed!", key="pause")
         
         else :
-            query = query.strip("<>")
-            if not re.match(URL_REGEX, query) :
-                query = f"ytsearch:{query}"
+            query = classify(query)
+            
+            if query.kind == PLAYLIST and (video := query.video) is not None :
+                # Start on the linked video while lavalink loads the whole playlist
+                loading = asyncio.ensure_future(self.get_tracks(query.target))
+                try :
+                    if not (tracks := await self.get_tracks(f"https://www.youtube.com/watch?v={video}")) :
+                        return await player.add_tracks(ctx, await loading)
+                    
+                    await player.add_tracks(ctx, tracks)
+                except BaseException :
+                    # Never handed to the ingest, so nothing else would await it
+                    if not loading.cancel() and not loading.cancelled() :
+                        loading.exception()
+                    raise
                 
-            await player.add_tracks(ctx, await self.wavelink.get_tracks(query))
+                return player.start_ingest(ctx, loading, skip=video)
+            
+            await player.add_tracks(ctx, await self.load_query(query))
     
     @play_command.error
     async def play_command_error(self, ctx, exc) :
         if isinstance(exc, QueueIsEmpty) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "No song in queue!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "No song in queue!!")
         
         elif isinstance(exc, NoVoiceChannel) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "No suitable voice channel was provided!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "No suitable voice channel was provided!!")
+        
+        elif isinstance(exc, TooManyQueries) :
+            await self.bot.responses.error(ctx, f"Too many songs at once, the limit is {BULK_MAX}!!")
     
     @commands.command(name="pause", aliases=["pa"])
     async def pause_command(self, ctx) :
@@ -408,37 +1017,20 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
             raise PlayerIsAlreadyPause
         
         await player.set_pause(True)
-        embed = discord.Embed(
-            title = "Information",
-            description = "Song Paused!",
-            colour = ctx.author.colour.blue()
-        )
-        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-        await ctx.send(embed=embed)
+        await self.bot.responses.info(ctx, "Song Paused!", key="pause")
     
     @pause_command.error
     async def pause_command_error(self, ctx, exc) :
         if isinstance(exc, PlayerIsAlreadyPause) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "The song already paused!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "The song already paused!!")
     
     @commands.command(name="stop", aliases=["reset"])
     async def stop_command(self, ctx) :
         player = self.get_player(ctx)
+        player.cancel_ingest()
         player.queue.empty()
         await player.stop()
-        embed = discord.Embed(
-            title = "Information",
-            description = "Bot Stopped!",
-            colour = ctx.author.colour.blue()
-        )
-        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-        await ctx.send(embed=embed)
+        await self.bot.responses.info(ctx, "Bot Stopped!")
     
     @commands.command(name="skip", aliases=["s"])
     async def skip_command(self, ctx) :
@@ -448,69 +1040,36 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
             raise NoMoreTracks
         
         await player.stop()
-        embed = discord.Embed(
-            title = "Information",
-            description = "Playing next song in queue!",
-            colour = ctx.author.colour.blue()
-        )
-        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-        await ctx.send(embed=embed)
+        await self.bot.responses.info(ctx, "Playing next song in queue!", key="skip")
     
     @skip_command.error
     async def queue_command_error(self, ctx, exc) :
         if isinstance(exc, QueueIsEmpty) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "Can't skip track while queue is empty!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "Can't skip track while queue is empty!!")
         if isinstance(exc, NoMoreTracks) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "No more tracks in queue!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "No more tracks in queue!!")
     
-#    @commands.command(name="back", aliases=["prev"])
-#    async def back_command(self, ctx) :
-#        player = self.get_player(ctx)
-#        
-#        if not player.queue.history :
-#            raise NoPreviousTracks
-#        
-#        player.queue.position -= 2
-#        await player.stop()
-#        embed = discord.Embed(
-#            title = "Information",
-#            description = "Playing previous song in queue!",
-#            colour = ctx.author.colour.blue()
-#        )
-#        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-#        await ctx.send(embed=embed)
-#    
-#    @back_command.error
-#    async def queue_command_error(self, ctx, exc) :
-#        if isinstance(exc, QueueIsEmpty) :
-#            embed = discord.Embed(
-#                title = "Information",
-#                description = "Can't back track while queue is empty!!",
-#                colour = ctx.author.colour.red()
-#            )
-#            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-#            await ctx.send(embed=embed)
-#            
-#        if isinstance(exc, NoPreviousTracks) :
-#            embed = discord.Embed(
-#                title = "Information",
-#                description = "No song in back queue!!",
-#                colour = ctx.author.colour.red()
-#            )
-#            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-#            await ctx.send(embed=embed)
+    @commands.command(name="back", aliases=["prev"])
+    async def back_command(self, ctx) :
+        player = self.get_player(ctx)
+        
+        if not player.queue.history :
+            raise NoPreviousTracks
+        
+        player.queue.position -= 2
+        if player.is_playing :
+            await player.stop()
+        else :
+            await player.advance()
+        await self.bot.responses.info(ctx, "Playing previous song in queue!", key="skip")
+    
+    @back_command.error
+    async def back_command_error(self, ctx, exc) :
+        if isinstance(exc, QueueIsEmpty) :
+            await self.bot.responses.error(ctx, "Can't back track while queue is empty!!")
+        
+        if isinstance(exc, NoPreviousTracks) :
+            await self.bot.responses.error(ctx, "No song in back queue!!")
     
 #    @commands.command(name="shuffle", aliases=["sh"])
 #    async def shuffle_command(self, ctx) :
@@ -541,13 +1100,7 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
         
         player = self.get_player(ctx)
         player.queue.set_repeat_mode(mode)
-        embed = discord.Embed(
-            title = "Information",
-            description = f"The playlist set to repeat {mode}",
-            colour = ctx.author.colour.blue()
-        )
-        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-        await ctx.send(embed=embed)
+        await self.bot.responses.info(ctx, f"The playlist set to repeat {mode}", key="repeat")
         
     @commands.command(name="queue", aliases=["q"])
     async def queue_command(self, ctx, show: t.Optional[int] = 10) :
@@ -556,41 +1109,12 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
         if player.queue.is_empty :
             raise QueueIsEmpty
         
-        embed = discord.Embed(
-            title = "Queue List",
-            description = 
-                f"Showing up to next {show} tracks\n"
-                f"Note! if the bot have bug, you can use 'stop' command and play again"
-                ,
-            colour = ctx.author.colour.blue(),
-            timestamp = dt.datetime.utcnow()
-        )
-        embed.set_author(name="Query Results")
-        embed.set_footer(text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.avatar_url)
-        embed.add_field(
-            name="Currently playing", 
-            value=getattr(player.queue.current_track, "title", "No tracks currently playing."), 
-            inline=False
-        )
-        if upcoming := player.queue.upcoming :
-            embed.add_field(
-                name="Next up",
-                value="\n - ".join(t.title for t in upcoming[:show]),
-                inline=False
-            )
-        
-        msg = await ctx.send(embed=embed)
+        msg = await self.bot.responses.send(ctx, queue_embed(ctx.author, player.queue, show))
 
     @queue_command.error
     async def queue_command_error(self, ctx, exc) :
         if isinstance(exc, QueueIsEmpty) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "The Queue is empty!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "The Queue is empty!!")
     
     @commands.group(name="volume", invoke_without_command=True)
     async def volume_group(self, ctx, volume: int) :
@@ -603,32 +1127,14 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
             raise VolumeTooHigh
         
         await player.set_volume(volume)
-        embed = discord.Embed(
-            title = "Information",
-            description = f"Volume set to : {volume:,}%",
-            colour = ctx.author.colour.blue()
-        )
-        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-        await ctx.send(embed=embed)
+        await self.bot.responses.info(ctx, f"Volume set to : {volume:,}%", key="volume")
     
     @volume_group.error
     async def volume_group_error(self, ctx, exc) :
         if isinstance(exc, VolumeTooLow) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "The volume is too low!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "The volume is too low!!")
         elif isinstance(exc, VolumeTooHigh) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "The volume is too high!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "The volume is too high!!")
     
     @volume_group.command(name="up")
     async def volume_up_command(self, ctx) :
@@ -638,24 +1144,12 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
             raise MaxVolume
         
         await player.set_volume(value := min(player.volume + 10, 150))
-        embed = discord.Embed(
-            title = "Information",
-            description = f"Volume set to {value:,}%",
-            colour = ctx.author.colour.blue()
-        )
-        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-        await ctx.send(embed=embed)
+        await self.bot.responses.info(ctx, f"Volume set to {value:,}%", key="volume")
         
     @volume_up_command.error
     async def volume_up_command_error(self, ctx, exc) :
         if isinstance(exc, MaxVolume) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "The player is already at max volume!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "The player is already at max volume!!")
     
     @volume_group.command(name="down")
     async def volume_down_command(self, ctx) :
@@ -665,32 +1159,30 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
             raise MinVolume
         
         await player.set_volume(value := max(player.volume - 10, 0))
-        embed = discord.Embed(
-            title = "Information",
-            description = f"Volume set to {value:,}%",
-            colour = ctx.author.colour.red()
-        )
-        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-        await ctx.send(embed=embed)
+        await self.bot.responses.info(ctx, f"Volume set to {value:,}%", key="volume")
         
     @volume_down_command.error
     async def volume_down_command_error(self, ctx, exc) :
         if isinstance(exc, MinVolume) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "The player is already at min volume!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "The player is already at min volume!!")
     
     @commands.command(name="playing", aliases=["np"])
-    async def playing_command(self, ctx) :
+    async def playing_command(self, ctx, mode: t.Optional[str]) :
         player = self.get_player(ctx)
         
+        if mode == "off" :
+            if not self.panels.close(ctx.guild.id) :
+                raise NoLivePanel
+            return await self.bot.responses.info(ctx, "Live panel stopped!")
+        
         if not player.is_playing :
             raise PlayerIsAlreadyPause
         
+        if mode == "live" :
+            render = lambda : self.render_panel(ctx.guild.id, ctx.author)
+            msg = await self.bot.responses.send(ctx, embed := render())
+            return self.panels.open(ctx.guild.id, msg, render, embed)
+        
         embed = discord.Embed(
             title = "Now Playing",
             colour = ctx.author.colour.blue(),
@@ -709,18 +1201,14 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
             inline = False
         )
         
-        await ctx.send(embed=embed)
+        await self.bot.responses.send(ctx, embed)
 
     @playing_command.error
     async def playing_command_error(self, ctx, exc) :
         if isinstance(exc, PlayerIsAlreadyPause) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "There is no song currently playing!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "There is no song currently playing!!")
+        elif isinstance(exc, NoLivePanel) :
+            await self.bot.responses.error(ctx, "There is no live panel in this server!!")
     
     @commands.command(name="skipto", aliases=["goto"])
     async def skipto_command(self, ctx, index: int) :
@@ -734,32 +1222,14 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
         
         player.queue.position = index - 2
         await player.stop()
-        embed = discord.Embed(
-            title = "Information",
-            description = f"Playing song in {index}",
-            colour = ctx.author.colour.blue()
-        )
-        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-        await ctx.send(embed=embed)
+        await self.bot.responses.info(ctx, f"Playing song in {index}", key="skip")
         
     @skipto_command.error
     async def skipto_command_error(self, ctx, exc) :
         if isinstance(exc, QueueIsEmpty) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "No tracks in queue!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "No tracks in queue!!")
         elif isinstance(exc, NoMoreTracks) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "No index found in queue!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "No index found in queue!!")
     
     @commands.command(name="remove", aliases=["rem"])
     async def remove_command(self, ctx, index: int) :
@@ -771,59 +1241,39 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
         if not 0 <= index <= player.queue.length :
             raise NoMoreTracks
         
-        del player.queue._queue[index]
-        embed = discord.Embed(
-            title = "Information",
-            description = f"Remove song for {index}",
-            colour = ctx.author.colour.blue()
-        )
-        embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-        await ctx.send(embed=embed)
+        player.queue.remove(index)
+        await self.bot.responses.info(ctx, f"Remove song for {index}")
     
     @remove_command.error
     async def remove_command_error(self, ctx, exc) :
         if isinstance(exc, NotConnected) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "The bot is not in voice channel!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "The bot is not in voice channel!!")
     
         if isinstance(exc, NoTracksInQueue) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "Couldn't find a track!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "Couldn't find a track!!")
         
         if isinstance(exc, NoMoreTracks) :
-            embed = discord.Embed(
-                title = "Information",
-                description = "No tracks are available on queue!!",
-                colour = ctx.author.colour.red()
-            )
-            embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
-            await ctx.send(embed=embed)
+            await self.bot.responses.error(ctx, "No tracks are available on queue!!")
         
     @commands.command(name="help")
     async def help_command(self, ctx) :    
            
         desc = str(
             "`.play <url>` -> Play a song with url or title\n"
+            "`.play <a>; <b>` -> Queue several songs at once, or attach a .txt file with one per line\n"
             "`.pause` -> Pause the song when you play it\n"
             "`.stop` -> Stop the song and delete all song from queue\n"
             "`.skip` -> Go to next song from queue\n"
+            "`.back` -> Go to previous song from queue\n"
             "`.rem` -> Remove the song with index track\n"
             "`.skipto <index>` -> Playing the next song from queue with index\n"
             "`.queue` -> See the queue list\n"
             "`.np` -> Displaying current track\n"
+            "`.np live` / `.np off` -> Keep a now playing panel updating, or stop it\n"
             "`.repeat <mode>` -> repeat the song when it play\n"
             "`.volume <index>` -> Setting up the volume\n"
             "`.leave` -> Disconnect the bot from voice channel\n"
+            "`.prefix <prefix>` -> Change the prefix in this server\n"
         )
         
         embed = discord.Embed(
@@ -835,7 +1285,7 @@ class Music(commands.Cog, wavelink.WavelinkMixin) :
         embed.set_footer(text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.avatar_url)
         embed.add_field(name="Commands", value = desc, inline = False)
         
-        await ctx.send(embed=embed)
+        await self.bot.responses.send(ctx, embed)
             
 
 def setup(bot) :
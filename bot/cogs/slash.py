@@ -0,0 +1,119 @@
+from discord.ext import commands
+
+import logging, time
+
+from bot.utils import SlashContext, option, register_commands, span, step
+from bot.utils.interactions import INTEGER
+
+COMMANDS = [
+    {"name": "play", "description": "Play a song with url or title, or resume the player", "options": [
+        option("query", "Song url or title, separate several with ;"),
+    ]},
+    {"name": "pause", "description": "Pause the song"},
+    {"name": "skip", "description": "Go to next song from queue"},
+    {"name": "queue", "description": "See the queue list", "options": [
+        option("show", "Number of tracks to show", INTEGER, min_value=1, max_value=25),
+    ]},
+    {"name": "volume", "description": "Setting up the volume", "options": [
+        option("volume", "Volume in percent", INTEGER, True, min_value=0, max_value=150),
+    ]},
+    {"name": "np", "description": "Displaying current track", "options": [
+        option("mode", "Keep a live panel updating, or stop it", choices=[
+            {"name": "live", "value": "live"},
+            {"name": "off", "value": "off"},
+        ]),
+    ]},
+    {"name": "skipto", "description": "Playing the song from queue with index", "options": [
+        option("index", "Index in queue", INTEGER, True),
+    ]},
+    {"name": "remove", "description": "Remove the song with index track", "options": [
+        option("index", "Index in queue", INTEGER, True),
+    ]},
+    {"name": "repeat", "description": "Repeat the song when it play", "options": [
+        option("mode", "Repeat mode", required=True, choices=[
+            {"name": "none", "value": "none"},
+            {"name": "one", "value": "1"},
+            {"name": "all", "value": "all"},
+        ]),
+    ]},
+]
+
+# Slash command name -> music command name
+ROUTES = {
+    "play": "play",
+    "pause": "pause",
+    "skip": "skip",
+    "queue": "queue",
+    "volume": "volume",
+    "np": "playing",
+    "skipto": "skipto",
+    "remove": "remove",
+    "repeat": "repeat",
+}
+
+log = logging.getLogger("bot.slash")
+
+class Slash(commands.Cog) :
+    def __init__(self, bot) :
+        self.bot = bot
+        self.registered = False
+    
+    @commands.Cog.listener()
+    async def on_ready(self) :
+        if self.bot.config["slash_commands"] and not self.registered :
+            await register_commands(self.bot, COMMANDS)
+            self.registered = True
+            log.info("Registered %d slash commands.", len(COMMANDS))
+    
+    @commands.Cog.listener()
+    async def on_socket_response(self, msg) :
+        if msg.get("t") == "INTERACTION_CREATE" and msg["d"].get("type") == 2 :
+            ctx = SlashContext(self.bot, msg["d"])
+            with span("slash_command", command=ctx.command_name, guild=getattr(ctx.guild, "id", None), author=ctx.author.id) as trace :
+                await self.invoke(ctx)
+                if (node := self.bot.player_node(ctx.guild)) is not None :
+                    trace.fields["node"] = node
+    
+    async def invoke(self, ctx) :
+        # Deferred first, so slow lavalink searches don't run into the 3 second limit
+        with step("discord") :
+            await ctx.defer()
+        
+        if ctx.guild is None :
+            return await ctx.send("Something went wrong, try again later!")
+        
+        music = self.bot.get_cog("Music")
+        command = self.bot.get_command(ROUTES.get(ctx.command_name, ""))
+        
+        if music is None or command is None :
+            return await ctx.send("Something went wrong, try again later!")
+        
+        kwargs = {name: None for name, param in command.clean_params.items() if param.default is param.empty}
+        kwargs.update(ctx.options)
+        
+        started = time.perf_counter()
+        try :
+            await command.callback(music, ctx, **kwargs)
+        except Exception as exc :
+            exc = getattr(exc, "original", exc)
+            self.bot.observe_command(command, time.perf_counter() - started, exc)
+            
+            if hasattr(command, "on_error") :
+                await command.on_error(music, ctx, exc)
+            await music.cog_command_error(ctx, exc)
+            
+            if not isinstance(exc, commands.CommandError) :
+                log.error("Ignoring exception in slash command %s", ctx.command_name, exc_info=exc)
+        else :
+            self.bot.observe_command(command, time.perf_counter() - started)
+        
+        if not ctx.responded :
+            await ctx.send("Done!")
+
+
+def setup(bot) :
+    bot.add_cog(Slash(bot))
+
+
+
+# bk-bot-mkb(Slash Cog), Created by BK Project
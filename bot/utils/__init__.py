@@ -0,0 +1,23 @@
+from .cache import TrackCache
+from .config import load_config
+from .entry import QueueEntry
+from .history import HistoryLog
+from .interactions import SlashContext, option, register_commands
+from .listeners import ListenerIndex
+from .logs import setup_logging, span, step
+from .metrics import Counter, Gauge, Histogram, MetricsServer, Registry
+from .nodes import best_node, node_load, node_penalty
+from .panels import PanelBoard
+from .prefixes import PrefixCache
+from .query import Query, classify
+from .registry import PlayerRegistry, player_size
+from .resolver import TrackResolver
+from .responses import Responder, template
+from .selections import SelectionManager
+from .store import TrackStore
+from .timers import TimerWheel
+from .tracklist import TrackList, TrackView
+from .watchdog import LoopWatchdog
+
+# bk-bot-mkb(utils)
+# Created by BK Project
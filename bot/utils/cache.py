@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+import time
+
+class TrackCache :
+    def __init__(self, maxsize=512, ttl=3600) :
+        self._entries = OrderedDict()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) :
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) :
+        if not (total := self.hits + self.misses) :
+            return 0.0
+
+        return self.hits / total
+
+    @property
+    def stats(self) :
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def get(self, key, count=True) :
+        try :
+            expires, value = self._entries[key]
+        except KeyError :
+            if count :
+                self.misses += 1
+            return None
+
+        if expires < time.monotonic() :
+            del self._entries[key]
+            self.evictions += 1
+            if count :
+                self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if count :
+            self.hits += 1
+        return value
+
+    def put(self, key, value) :
+        if value is None :
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize :
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key) :
+        self._entries.pop(key, None)
+
+    def clear(self) :
+        self._entries.clear()
+
+
+# bk-bot-mkb(track cache), Created by BK Project
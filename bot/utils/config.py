@@ -0,0 +1,56 @@
+import json
+
+DEFAULTS = {
+    "prefix": ".",
+    "lean_gateway": False,
+    "message_commands": True,
+    "slash_commands": False,
+    "empty_channel_timeout": 30,
+    "max_players": 1000,
+    "player_idle_timeout": 600,
+    "placeholder_timeout": 120,
+    "logging": {
+        "level": "INFO",
+        "format": "text",
+        "library_level": "WARNING",
+    },
+    "watchdog": {
+        "enabled": True,
+        "threshold": 0.25,
+    },
+    "metrics": {
+        "enabled": False,
+        "host": "127.0.0.1",
+        "port": 9100,
+    },
+    "nodes": [
+        {
+            "identifier": "MAIN",
+            "host": "127.0.0.1",
+            "port": 2333,
+            "rest_uri": "http://127.0.0.1:2333",
+            "password": "bkserverlink",
+            "region": "singapore",
+        },
+    ],
+}
+
+def load_config(path="bot/data/config.json") :
+    config = json.loads(json.dumps(DEFAULTS))
+
+    try :
+        with open(path, "r", encoding="utf-8") as cf :
+            data = json.load(cf)
+    except FileNotFoundError :
+        return config
+
+    for key, value in data.items() :
+        if isinstance(value, dict) and isinstance(config.get(key), dict) :
+            config[key].update(value)
+        else :
+            config[key] = value
+
+    return config
+
+
+# bk-bot-mkb(config), Created by BK Project
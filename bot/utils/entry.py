@@ -0,0 +1,26 @@
+import wavelink
+
+class QueueEntry :
+    __slots__ = ("id", "title", "author", "length")
+
+    def __init__(self, id_, title, author, length) :
+        self.id = id_
+        self.title = title
+        self.author = author
+        self.length = length
+
+    def __str__(self) :
+        return self.title
+
+    @classmethod
+    def from_track(cls, track) :
+        if isinstance(track, cls) :
+            return track
+
+        return cls(track.id, track.title, track.author, track.length)
+
+    def build(self) :
+        return wavelink.Track(self.id, {"title": self.title, "author": self.author, "length": self.length})
+
+
+# bk-bot-mkb(queue entry), Created by BK Project
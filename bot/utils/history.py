@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import asyncio, os
+
+class HistoryLog :
+    def __init__(self, path, max_bytes=1 << 20) :
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.spilled = 0
+        self._pending = []
+        self._task = None
+
+    def write(self, tracks) :
+        self._pending.extend(
+            f"{getattr(t, 'id', '')}\t{getattr(t, 'title', '')}".replace("\n", " ")
+            for t in tracks
+        )
+        self.spilled += len(tracks)
+
+        if self._task is None or self._task.done() :
+            self._task = asyncio.ensure_future(self.flush())
+
+    async def flush(self) :
+        while self._pending :
+            lines, self._pending = self._pending, []
+            await asyncio.get_event_loop().run_in_executor(None, self._append, lines)
+
+    def _append(self, lines) :
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.path.exists() and self.path.stat().st_size > self.max_bytes :
+            os.replace(self.path, self.path.with_suffix(self.path.suffix + ".1"))
+
+        with open(self.path, "a", encoding="utf-8") as log :
+            log.write("\n".join(lines) + "\n")
+
+
+# bk-bot-mkb(history log), Created by BK Project
@@ -0,0 +1,100 @@
+from discord.http import Route
+
+import discord
+
+# discord.py 1.x has no interaction support, so they are answered over raw HTTP
+class InteractionRoute(Route) :
+    BASE = "https://discord.com/api/v10"
+
+STRING = 3
+INTEGER = 4
+
+CHANNEL_MESSAGE = 4
+DEFERRED_MESSAGE = 5
+UPDATE_MESSAGE = 7
+
+EPHEMERAL = 1 << 6
+
+class SlashContext :
+    def __init__(self, bot, data) :
+        self.bot = bot
+        self.data = data
+        self.id = int(data["id"])
+        self.token = data["token"]
+        self.application_id = int(data["application_id"])
+        self.guild = bot.get_guild(int(data["guild_id"])) if "guild_id" in data else None
+        self.channel = bot.get_channel(int(data["channel_id"]))
+        self.message = None
+        self.responded = False
+        self.options = {o["name"]: o["value"] for o in data["data"].get("options", [])}
+
+        if self.guild is not None :
+            self.author = self.guild.get_member(int(data["member"]["user"]["id"])) or discord.Member(
+                data=data["member"], guild=self.guild, state=bot._connection
+            )
+        else :
+            self.author = bot._connection.store_user(data["user"])
+
+    @property
+    def command_name(self) :
+        return self.data["data"]["name"]
+
+    async def defer(self) :
+        await respond(self.bot, self.data, DEFERRED_MESSAGE)
+
+    async def send(self, content=None, *, embed=None, components=None) :
+        payload = {"content": content, "embeds": [embed.to_dict()] if embed else []}
+        if components is not None :
+            payload["components"] = components
+
+        if not self.responded :
+            # The first reply fills in the deferred "thinking..." message
+            route = InteractionRoute(
+                "PATCH", "/webhooks/{application_id}/{interaction_token}/messages/@original",
+                application_id=self.application_id, interaction_token=self.token
+            )
+            self.responded = True
+        else :
+            route = InteractionRoute(
+                "POST", "/webhooks/{application_id}/{interaction_token}",
+                application_id=self.application_id, interaction_token=self.token
+            )
+
+        data = await self.bot.http.request(route, json=payload)
+        return discord.Message(state=self.bot._connection, channel=self.channel, data=data)
+
+async def respond(bot, data, kind, payload=None) :
+    body = {"type": kind}
+    if payload is not None :
+        body["data"] = payload
+
+    await bot.http.request(
+        InteractionRoute(
+            "POST", "/interactions/{interaction_id}/{interaction_token}/callback",
+            interaction_id=data["id"], interaction_token=data["token"]
+        ),
+        json=body,
+    )
+
+async def send_components(ctx, embed, components) :
+    if isinstance(ctx, SlashContext) :
+        return await ctx.send(embed=embed, components=components)
+
+    # Message commands have no webhook, the channel endpoint takes components too
+    data = await ctx.bot.http.request(
+        InteractionRoute("POST", "/channels/{channel_id}/messages", channel_id=ctx.channel.id),
+        json={"embeds": [embed.to_dict()], "components": components},
+    )
+    return discord.Message(state=ctx.bot._connection, channel=ctx.channel, data=data)
+
+def option(name, description, kind=STRING, required=False, **extra) :
+    return {"name": name, "description": description, "type": kind, "required": required, **extra}
+
+async def register_commands(bot, commands) :
+    return await bot.http.request(
+        InteractionRoute("PUT", "/applications/{application_id}/commands", application_id=bot.user.id),
+        json=commands,
+    )
+
+
+# bk-bot-mkb(interactions), Created by BK Project
@@ -0,0 +1,37 @@
+class ListenerIndex :
+    def __init__(self) :
+        self._channels = {}
+
+    def __contains__(self, channel_id) :
+        return channel_id in self._channels
+
+    def track(self, channel_id, user_ids=()) :
+        self._channels[channel_id] = set(user_ids)
+
+    def untrack(self, channel_id) :
+        self._channels.pop(channel_id, None)
+
+    def count(self, channel_id) :
+        return len(self._channels.get(channel_id, ()))
+
+    def is_empty(self, channel_id) :
+        return not self._channels.get(channel_id)
+
+    def move(self, user_id, before_id, after_id) :
+        changed = []
+
+        if before_id == after_id :
+            return changed
+
+        if (listeners := self._channels.get(before_id)) is not None :
+            listeners.discard(user_id)
+            changed.append(before_id)
+
+        if (listeners := self._channels.get(after_id)) is not None :
+            listeners.add(user_id)
+            changed.append(after_id)
+
+        return changed
+
+
+# bk-bot-mkb(listener index), Created by BK Project
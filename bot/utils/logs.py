@@ -0,0 +1,110 @@
+import contextvars, copy, itertools, json, logging, logging.handlers, queue, sys, time
+
+from contextlib import contextmanager
+
+log = logging.getLogger("bot.trace")
+
+current_span = contextvars.ContextVar("current_span", default=None)
+span_ids = itertools.count(1)
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+class TextFormatter(logging.Formatter) :
+    def __init__(self) :
+        super().__init__(TEXT_FORMAT)
+
+    def formatMessage(self, record) :
+        # Span fields stay on the first line, a traceback follows below them
+        line = super().formatMessage(record)
+        if (fields := getattr(record, "span", None)) :
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+class JsonFormatter(logging.Formatter) :
+    def format(self, record) :
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if (fields := getattr(record, "span", None)) :
+            entry.update(fields)
+        if record.exc_info :
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+FORMATTERS = {"text": TextFormatter, "json": JsonFormatter}
+
+class RecordQueueHandler(logging.handlers.QueueHandler) :
+    def prepare(self, record) :
+        # The stock prepare formats the record and drops exc_info, this only merges the args
+        # and leaves the traceback to the listener's formatter
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+def setup_logging(config) :
+    # Records are handed to a queue on the loop, a listener thread does the blocking writes
+    records = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(FORMATTERS[config["format"]]())
+
+    root = logging.getLogger()
+    root.handlers[:] = [RecordQueueHandler(records)]
+    root.setLevel(config["level"])
+    logging.getLogger("discord").setLevel(config["library_level"])
+    logging.getLogger("wavelink").setLevel(config["library_level"])
+
+    listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+class Span :
+    __slots__ = ("id", "name", "fields", "steps", "started")
+
+    def __init__(self, name, fields) :
+        self.id = next(span_ids)
+        self.name = name
+        self.fields = fields
+        self.steps = {}
+        self.started = time.perf_counter()
+
+    def add(self, step, elapsed) :
+        self.steps[step] = self.steps.get(step, 0.0) + elapsed
+
+@contextmanager
+def span(name, **fields) :
+    # One per command or lavalink event, steps inside it add up their time
+    current = Span(name, {k: v for k, v in fields.items() if v is not None})
+    token = current_span.set(current)
+    error = None
+
+    try :
+        yield current
+    except BaseException as exc :
+        error = type(exc).__name__
+        raise
+    finally :
+        current_span.reset(token)
+        elapsed = (time.perf_counter() - current.started) * 1000
+        data = {"span": current.name, "span_id": current.id, **current.fields, "duration_ms": round(elapsed, 2)}
+        data.update((f"{step}_ms", round(value * 1000, 2)) for step, value in current.steps.items())
+        if error is not None :
+            data["error"] = error
+        log.info("%s finished in %.1f ms", current.name, elapsed, extra={"span": data})
+
+@contextmanager
+def step(name) :
+    if (current := current_span.get()) is None :
+        yield
+        return
+
+    started = time.perf_counter()
+    try :
+        yield
+    finally :
+        current.add(name, time.perf_counter() - started)
+
+
+# bk-bot-mkb(logging), Created by BK Project
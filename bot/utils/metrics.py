@@ -0,0 +1,156 @@
+import bisect, logging, math
+
+from aiohttp import web
+
+log = logging.getLogger("bot.metrics")
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def escape(value) :
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def label_text(names, values, extra=()) :
+    pairs = [f'{n}="{escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def number(value) :
+    if math.isinf(value) :
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric :
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labels=()) :
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+
+    def key(self, labels) :
+        return tuple(str(labels[n]) for n in self.labels)
+
+    def clear(self) :
+        self._values.clear()
+
+    def samples(self) :
+        for key, value in self._values.items() :
+            yield self.name, label_text(self.labels, key), value
+
+    def render(self) :
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {number(value)}" for name, labels, value in self.samples())
+        return "\n".join(lines)
+
+class Counter(Metric) :
+    kind = "counter"
+
+    def inc(self, amount=1, **labels) :
+        key = self.key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value, **labels) :
+        # For totals already counted elsewhere, e.g. TrackCache.hits
+        self._values[self.key(labels)] = value
+
+class Gauge(Metric) :
+    kind = "gauge"
+
+    def set(self, value, **labels) :
+        self._values[self.key(labels)] = value
+
+    def inc(self, amount=1, **labels) :
+        key = self.key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+class Histogram(Metric) :
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=BUCKETS) :
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels) :
+        if (series := self._values.get(key := self.key(labels))) is None :
+            # Per bucket counts, then sum and count
+            series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+
+        if (index := bisect.bisect_left(self.buckets, value)) < len(self.buckets) :
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self) :
+        for key, (counts, total, count) in self._values.items() :
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts) :
+                cumulative += bucket
+                yield f"{self.name}_bucket", label_text(self.labels, key, [f'le="{number(bound)}"']), cumulative
+            yield f"{self.name}_bucket", label_text(self.labels, key, ['le="+Inf"']), count
+            yield f"{self.name}_sum", label_text(self.labels, key), total
+            yield f"{self.name}_count", label_text(self.labels, key), count
+
+class Registry :
+    def __init__(self) :
+        self._metrics = {}
+        self._collectors = []
+
+    def register(self, metric) :
+        # Cogs can be reloaded, the existing metric keeps its values
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labels=()) :
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()) :
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=BUCKETS) :
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def collector(self, callback) :
+        # Called before every scrape to refresh gauges read from live state
+        self._collectors.append(callback)
+        return callback
+
+    def remove_collector(self, callback) :
+        if callback in self._collectors :
+            self._collectors.remove(callback)
+
+    def render(self) :
+        for callback in list(self._collectors) :
+            try :
+                callback()
+            except Exception :
+                log.exception("Metrics collector %r failed", callback)
+
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+class MetricsServer :
+    def __init__(self, registry, host="127.0.0.1", port=9100) :
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def handle(self, request) :
+        return web.Response(
+            body = self.registry.render().encode(),
+            headers = {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+        )
+
+    async def start(self) :
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self) :
+        if self._runner is not None :
+            await self._runner.cleanup()
+            self._runner = None
+
+
+# bk-bot-mkb(metrics), Created by BK Project
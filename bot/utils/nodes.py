@@ -0,0 +1,54 @@
+import math
+
+def node_penalty(node) :
+    if not node.is_available :
+        return math.inf
+
+    if (stats := node.stats) is None :
+        # No stats payload yet, fall back to what this client placed on it
+        return len(node.players)
+
+    # Same curves lavalink clients use, plus the lavalink process share of the cpu
+    penalty = stats.playing_players
+    penalty += 1.05 ** (100 * stats.system_load) * 10 - 10
+    penalty += 1.05 ** (100 * stats.lavalink_load) * 5 - 5
+
+    if stats.frames_deficit != -1 :
+        penalty += 1.03 ** (500 * stats.frames_deficit / 3000) * 600 - 600
+
+    if stats.frames_nulled != -1 :
+        penalty += (1.03 ** (500 * stats.frames_nulled / 3000) * 300 - 300) * 2
+
+    return penalty
+
+def best_node(nodes, region=None) :
+    region = str(region or "").lower()
+    ranked = sorted(
+        (node_penalty(node), (node.region or "").lower() != region, node.identifier, node)
+        for node in nodes
+    )
+
+    if not ranked or ranked[0][0] == math.inf :
+        return None
+
+    return ranked[0][-1]
+
+def node_load(node) :
+    stats = node.stats
+
+    return {
+        "identifier": node.identifier,
+        "region": node.region,
+        "available": node.is_available,
+        "players": len(node.players),
+        "connected": sum(1 for p in node.players.values() if p.is_connected),
+        "playing": getattr(stats, "playing_players", 0),
+        "system_load": getattr(stats, "system_load", 0.0),
+        "lavalink_load": getattr(stats, "lavalink_load", 0.0),
+        "frames_deficit": getattr(stats, "frames_deficit", -1),
+        "frames_nulled": getattr(stats, "frames_nulled", -1),
+        "penalty": node_penalty(node),
+    }
+
+
+# bk-bot-mkb(node balancing), Created by BK Project
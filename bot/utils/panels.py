@@ -0,0 +1,79 @@
+import collections, logging
+
+import discord
+
+log = logging.getLogger("bot.panels")
+
+class Panel :
+    __slots__ = ("message", "render", "rendered")
+
+    def __init__(self, message, render) :
+        self.message = message
+        self.render = render
+        self.rendered = None
+
+class PanelBoard :
+    def __init__(self, max_edits=20) :
+        self.max_edits = max_edits
+        self._panels = collections.OrderedDict()
+        self.edits = 0
+        self.skipped = 0
+
+    def __len__(self) :
+        return len(self._panels)
+
+    def __contains__(self, guild_id) :
+        return guild_id in self._panels
+
+    def open(self, guild_id, message, render, embed) :
+        self._panels.pop(guild_id, None)
+        self._panels[guild_id] = panel = Panel(message, render)
+        panel.rendered = embed.to_dict()
+
+    def close(self, guild_id) :
+        return self._panels.pop(guild_id, None) is not None
+
+    async def tick(self) :
+        edits = 0
+
+        for guild_id in list(self._panels) :
+            if edits >= self.max_edits :
+                break
+
+            if (panel := self._panels.get(guild_id)) is None :
+                continue
+
+            # Served panels go to the back, so a capped tick resumes where it stopped
+            self._panels.move_to_end(guild_id)
+
+            try :
+                embed = panel.render()
+            except Exception :
+                # One broken panel is closed, the others keep updating
+                log.exception("Couldn't render the now playing panel in guild %s", guild_id)
+                embed = None
+
+            if embed is None :
+                self.close(guild_id)
+                continue
+
+            if (rendered := embed.to_dict()) == panel.rendered :
+                self.skipped += 1
+                continue
+
+            try :
+                await panel.message.edit(embed=embed)
+            except discord.NotFound :
+                self.close(guild_id)
+            except discord.HTTPException :
+                log.exception("Couldn't update the now playing panel in guild %s", guild_id)
+            else :
+                panel.rendered = rendered
+                self.edits += 1
+            edits += 1
+
+    def stats(self) :
+        return {"panels": len(self._panels), "edits": self.edits, "skipped": self.skipped}
+
+
+# bk-bot-mkb(panels), Created by BK Project
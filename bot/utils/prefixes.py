@@ -0,0 +1,49 @@
+import asyncio, json
+
+class PrefixCache :
+    def __init__(self, path="bot/data/prefixes.json", default=".") :
+        self.path = path
+        self.default = default
+        self.user_id = None
+        self._mentions = ()
+        self._matchers = {}
+
+        try :
+            with open(path, "r", encoding="utf-8") as pf :
+                self._prefixes = {int(k): v for k, v in json.load(pf).items()}
+        except FileNotFoundError :
+            self._prefixes = {}
+
+    def set_user(self, user_id) :
+        self.user_id = user_id
+        self._mentions = (f"<@{user_id}> ", f"<@!{user_id}> ")
+        self._matchers.clear()
+
+    def get(self, guild_id) :
+        return self._prefixes.get(guild_id, self.default)
+
+    def matcher(self, guild_id) :
+        if (matcher := self._matchers.get(guild_id)) is None :
+            matcher = self._matchers[guild_id] = (*self._mentions, self.get(guild_id))
+
+        return matcher
+
+    def match(self, guild_id, content) :
+        return content.startswith(self.matcher(guild_id))
+
+    async def set(self, guild_id, prefix) :
+        if prefix == self.default :
+            self._prefixes.pop(guild_id, None)
+        else :
+            self._prefixes[guild_id] = prefix
+
+        self._matchers.pop(guild_id, None)
+        data = json.dumps({str(k): v for k, v in self._prefixes.items()}, indent=4)
+        await asyncio.get_event_loop().run_in_executor(None, self._save, data)
+
+    def _save(self, data) :
+        with open(self.path, "w", encoding="utf-8") as pf :
+            pf.write(data)
+
+
+# bk-bot-mkb(prefix cache), Created by BK Project
@@ -0,0 +1,122 @@
+import re
+
+from urllib.parse import urlsplit
+
+SEARCH = "search"
+TRACK = "track"
+PLAYLIST = "playlist"
+STREAM = "stream"
+
+# Explicit search providers, application.yml enables youtube and soundcloud search
+SEARCH_SOURCES = {"ytsearch:": "youtube", "ytmsearch:": "youtube", "scsearch:": "soundcloud"}
+SEARCH_PREFIXES = tuple(SEARCH_SOURCES)
+DEFAULT_SEARCH = "ytsearch:"
+# Providers tried in order when a search comes back empty
+SEARCH_FALLBACKS = {"ytsearch:": ("scsearch:",), "ytmsearch:": ("ytsearch:", "scsearch:"), "scsearch:": ("ytsearch:",)}
+
+HOSTS = {
+    "youtube.com": "youtube", "www.youtube.com": "youtube", "m.youtube.com": "youtube",
+    "music.youtube.com": "youtube", "youtu.be": "youtube",
+    "soundcloud.com": "soundcloud", "www.soundcloud.com": "soundcloud", "m.soundcloud.com": "soundcloud",
+    "on.soundcloud.com": "soundcloud",
+    "twitch.tv": "twitch", "www.twitch.tv": "twitch", "m.twitch.tv": "twitch",
+    "vimeo.com": "vimeo", "www.vimeo.com": "vimeo", "player.vimeo.com": "vimeo",
+}
+
+SCHEME = re.compile(r"(?i)https?://")
+PREFIX = re.compile(r"(?i)(?:yt|ytm|sc)search:")
+YOUTUBE_VIDEO = re.compile(r"(?:^|&)v=([\w-]{11})")
+YOUTUBE_LIST = re.compile(r"(?:^|&)list=")
+YOUTUBE_SHORT = re.compile(r"/(?:shorts|embed|live)/([\w-]{11})")
+SOUNDCLOUD_SET = re.compile(r"/[^/]+/sets/[^/]+")
+# Last resort for links typed without a scheme, e.g. "www.example.com/song.mp3"
+URL_REGEX = re.compile(r"(?i)\b((?:https?://|www\d{0,3}[.]|[a-z0-9.\-]+[.][a-z]{2,4}/)(?:[^\s()<>]+|\(([^\s()<>]+|(\([^\s()<>]+\)))*\))+(?:\(([^\s()<>]+|(\([^\s()<>]+\)))*\)|[^\s`!()\[\]{};:'\".,<>?«»“”‘’]))")
+
+class Query :
+    __slots__ = ("kind", "source", "target", "video", "fallbacks")
+
+    def __init__(self, kind, source, target, video=None, fallbacks=()) :
+        self.kind = kind
+        self.source = source
+        self.target = target
+        self.video = video
+        self.fallbacks = fallbacks
+
+    def __repr__(self) :
+        return f"Query({self.kind!r}, {self.source!r}, {self.target!r})"
+
+def search(terms, prefix=DEFAULT_SEARCH) :
+    return Query(
+        SEARCH, SEARCH_SOURCES[prefix], prefix + terms,
+        fallbacks = [fallback + terms for fallback in SEARCH_FALLBACKS[prefix]]
+    )
+
+def youtube(url, parts) :
+    if parts.hostname == "youtu.be" :
+        video = parts.path.strip("/") or None
+    elif parts.path == "/watch" :
+        video = (match := YOUTUBE_VIDEO.search(parts.query)) and match.group(1)
+    else :
+        video = (match := YOUTUBE_SHORT.match(parts.path)) and match.group(1)
+
+    if YOUTUBE_LIST.search(parts.query) :
+        # A video inside a playlist starts on the video, see Music.play_command
+        return Query(PLAYLIST, "youtube", url, video=video)
+
+    if video :
+        # One spelling per video, so youtu.be and watch?v= links share a cache entry
+        return Query(TRACK, "youtube", f"https://www.youtube.com/watch?v={video}")
+
+    return Query(TRACK, "youtube", url)
+
+def soundcloud(url, parts) :
+    if parts.hostname == "on.soundcloud.com" :
+        return Query(TRACK, "soundcloud", url)
+
+    kind = PLAYLIST if SOUNDCLOUD_SET.match(parts.path) else TRACK
+    return Query(kind, "soundcloud", f"https://soundcloud.com{parts.path.rstrip('/')}")
+
+def bandcamp(url, parts) :
+    kind = PLAYLIST if parts.path.startswith("/album/") else TRACK
+    return Query(kind, "bandcamp", f"https://{parts.hostname}{parts.path.rstrip('/')}")
+
+def twitch(url, parts) :
+    return Query(STREAM, "twitch", url)
+
+def vimeo(url, parts) :
+    return Query(TRACK, "vimeo", url)
+
+def http(url, parts) :
+    return Query(TRACK, "http", url)
+
+CLASSIFIERS = {
+    "youtube": youtube,
+    "soundcloud": soundcloud,
+    "bandcamp": bandcamp,
+    "twitch": twitch,
+    "vimeo": vimeo,
+    "http": http,
+}
+
+def classify(text) :
+    text = text.strip().strip("<>")
+
+    if match := PREFIX.match(text) :
+        return search(text[match.end():].strip(), match.group().lower())
+
+    if not SCHEME.match(text) :
+        # Plain words never reach the big regex
+        if " " in text or "." not in text or not URL_REGEX.match(text) :
+            return search(text)
+        text = f"https://{text}"
+
+    parts = urlsplit(text)
+    host = parts.hostname or ""
+
+    if (source := HOSTS.get(host)) is None :
+        source = "bandcamp" if host.endswith(".bandcamp.com") else "http"
+
+    return CLASSIFIERS[source](text, parts)
+
+
+# bk-bot-mkb(query classifier), Created by BK Project
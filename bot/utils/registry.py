@@ -0,0 +1,67 @@
+import sys, time
+
+class PlayerRegistry :
+    def __init__(self, max_players=1000, idle_timeout=600, placeholder_timeout=120) :
+        self.max_players = max_players
+        self.idle_timeout = idle_timeout
+        self.placeholder_timeout = placeholder_timeout
+        self.evicted = 0
+        self._active = {}
+
+    def touch(self, guild_id) :
+        self._active[guild_id] = time.monotonic()
+
+    def forget(self, guild_id) :
+        self._active.pop(guild_id, None)
+
+    def idle_for(self, guild_id) :
+        return time.monotonic() - self._active.get(guild_id, 0)
+
+    def expired(self, players) :
+        expired = []
+
+        for player in players :
+            if not player.is_connected :
+                if self.idle_for(player.guild_id) > self.placeholder_timeout :
+                    expired.append(player)
+            elif not player.is_playing and self.idle_for(player.guild_id) > self.idle_timeout :
+                expired.append(player)
+
+        return expired
+
+    def overflow(self, players) :
+        # Oldest placeholders first, never a player that is in a voice channel
+        placeholders = sorted(
+            (p for p in players if not p.is_connected),
+            key=lambda p : self._active.get(p.guild_id, 0)
+        )
+        return placeholders[:max(len(players) - self.max_players + 1, 0)]
+
+    def stats(self, players) :
+        connected = [p for p in players if p.is_connected]
+
+        return {
+            "total": len(players),
+            "connected": len(connected),
+            "playing": sum(1 for p in connected if p.is_playing),
+            "placeholders": len(players) - len(connected),
+            "queued": sum(p.queue.length for p in players),
+            "evicted": self.evicted,
+            "memory": sum(map(player_size, players)),
+        }
+
+def player_size(player) :
+    # Rough per player footprint: the objects it owns plus its queued entries
+    size = sys.getsizeof(player) + sys.getsizeof(player.__dict__) + sys.getsizeof(player.queue.__dict__)
+
+    if length := player.queue.length :
+        sample = list(player.queue._queue.islice(0, 32))
+        size += length * sum(
+            sys.getsizeof(e) + sum(sys.getsizeof(getattr(e, a, None)) for a in ("id", "title", "author", "length"))
+            for e in sample
+        ) // len(sample)
+
+    return size
+
+
+# bk-bot-mkb(player registry), Created by BK Project
@@ -0,0 +1,77 @@
+import asyncio, wavelink
+
+from .nodes import best_node
+from .query import SEARCH_PREFIXES
+
+class TrackResolver :
+    def __init__(self, client, cache, store=None, max_requests=4) :
+        self.client = client
+        self.cache = cache
+        self.store = store
+        self.max_requests = max_requests
+        self._flights = {}
+        self._limits = {}
+        self.coalesced = 0
+        self.requests = 0
+
+    @property
+    def in_flight(self) :
+        return len(self._flights)
+
+    def normalize(self, query) :
+        for prefix in SEARCH_PREFIXES :
+            if query.startswith(prefix) :
+                return prefix + " ".join(query[len(prefix):].lower().split())
+
+        return query
+
+    def limit(self, node) :
+        if (sem := self._limits.get(node.identifier)) is None :
+            sem = self._limits[node.identifier] = asyncio.Semaphore(self.max_requests)
+
+        return sem
+
+    async def get_tracks(self, query) :
+        key = self.normalize(query)
+
+        if (tracks := self.cache.get(key)) is not None :
+            return tracks
+
+        if (flight := self._flights.get(key)) is not None :
+            self.coalesced += 1
+        else :
+            # The lookup runs in its own task that every caller shields,
+            # so one caller being cancelled never cancels it for the others
+            flight = self._flights[key] = asyncio.ensure_future(self.fly(key))
+            flight.add_done_callback(lambda done : self.land(key, done))
+
+        return await asyncio.shield(flight)
+
+    async def fly(self, key) :
+        tracks = await self.fetch(key)
+        self.cache.put(key, tracks)
+        return tracks
+
+    def land(self, key, flight) :
+        if self._flights.get(key) is flight :
+            del self._flights[key]
+
+    async def fetch(self, query) :
+        if self.store is not None and (tracks := await self.store.get(query)) is not None :
+            return tracks
+
+        tracks = await self.load(query)
+        if self.store is not None :
+            self.store.put(query, tracks)
+        return tracks
+
+    async def load(self, query) :
+        if (node := best_node(self.client.nodes.values())) is None :
+            raise wavelink.ZeroConnectedNodes
+
+        async with self.limit(node) :
+            self.requests += 1
+            return await node.get_tracks(query)
+
+
+# bk-bot-mkb(track resolver), Created by BK Project
@@ -0,0 +1,172 @@
+import asyncio, collections, logging, time
+
+import discord
+
+from .interactions import send_components
+from .logs import step
+
+log = logging.getLogger("bot.responses")
+
+def template(ctx, description, error=False) :
+    embed = discord.Embed(
+        title = "Information",
+        description = description,
+        colour = ctx.author.colour.red() if error else ctx.author.colour.blue()
+    )
+    embed.set_footer(text = f"Requested by {ctx.author.display_name}", icon_url = ctx.author.avatar_url)
+    return embed
+
+class Reply :
+    __slots__ = ("ctx", "embed", "key", "components", "futures")
+
+    def __init__(self, ctx, embed, key, components=None) :
+        self.ctx = ctx
+        self.embed = embed
+        self.key = key
+        self.components = components
+        self.futures = [asyncio.get_event_loop().create_future()]
+
+    def resolve(self, msg=None, exc=None) :
+        for future in self.futures :
+            if future.done() :
+                continue
+            if exc is not None :
+                future.set_exception(exc)
+            else :
+                future.set_result(msg)
+
+class Responder :
+    # Discord allows 5 messages per 5 seconds in a channel
+    def __init__(self, rate=5, per=5.0, edit_window=15.0, max_pending=20) :
+        self.rate = rate
+        self.per = per
+        self.edit_window = edit_window
+        self.max_pending = max_pending
+        self._pending = {}
+        self._sent = {}
+        self._last = {}
+        self._workers = {}
+        self.sent = 0
+        self.edited = 0
+        self.merged = 0
+        self.dropped = 0
+
+    def info(self, ctx, description, key=None) :
+        return self.send(ctx, template(ctx, description), key)
+
+    def error(self, ctx, description, key=None) :
+        return self.send(ctx, template(ctx, description, error=True), key)
+
+    async def send(self, ctx, embed, key=None, components=None) :
+        with step("discord") :
+            return await self.enqueue(ctx, embed, key, components)
+
+    async def enqueue(self, ctx, embed, key=None, components=None) :
+        # Interaction replies go to their own webhook, not the channel bucket
+        if getattr(ctx, "message", None) is None :
+            if components is not None :
+                return await send_components(ctx, embed, components)
+            return await ctx.send(embed=embed)
+
+        channel_id = ctx.channel.id
+        pending = self._pending.setdefault(channel_id, collections.deque())
+
+        if key is not None and (reply := next((r for r in pending if r.key == key), None)) is not None :
+            # A newer status supersedes the queued one, both callers get the same message
+            reply.ctx, reply.embed = ctx, embed
+            reply.futures.append(future := asyncio.get_event_loop().create_future())
+            self.merged += 1
+            return await future
+
+        if len(pending) >= self.max_pending and (stale := next((r for r in pending if r.key is not None), None)) :
+            # Only status replies are disposable, results and menus always go out
+            pending.remove(stale)
+            stale.resolve()
+            self.dropped += 1
+
+        pending.append(reply := Reply(ctx, embed, key, components))
+        if channel_id not in self._workers :
+            self._workers[channel_id] = asyncio.ensure_future(self.drain(channel_id))
+
+        return await reply.futures[0]
+
+    async def wait_turn(self, channel_id) :
+        sent = self._sent.setdefault(channel_id, collections.deque(maxlen=self.rate))
+        now = time.monotonic()
+
+        if len(sent) == self.rate and (delay := sent[0] + self.per - now) > 0 :
+            await asyncio.sleep(delay)
+
+        sent.append(time.monotonic())
+
+    async def drain(self, channel_id) :
+        pending = self._pending[channel_id]
+
+        try :
+            while pending :
+                await self.wait_turn(channel_id)
+                if not pending :
+                    break
+
+                reply = pending.popleft()
+                try :
+                    reply.resolve(await self.deliver(channel_id, reply))
+                except Exception as exc :
+                    reply.resolve(exc=exc)
+        except asyncio.CancelledError :
+            while pending :
+                pending.popleft().resolve()
+            raise
+        except Exception :
+            log.exception("Reply queue for channel %s stopped", channel_id)
+        finally :
+            self._workers.pop(channel_id, None)
+            if not pending :
+                self._pending.pop(channel_id, None)
+
+    async def deliver(self, channel_id, reply) :
+        last = self._last.get(channel_id)
+
+        if (
+            reply.key is not None and last is not None and last[0] == reply.key
+            and time.monotonic() - last[2] < self.edit_window
+        ) :
+            try :
+                await last[1].edit(embed=reply.embed)
+            except discord.NotFound :
+                pass
+            else :
+                self.edited += 1
+                return last[1]
+
+        if reply.components is not None :
+            msg = await send_components(reply.ctx, reply.embed, reply.components)
+        else :
+            msg = await reply.ctx.send(embed=reply.embed)
+        self._last[channel_id] = (reply.key, msg, time.monotonic())
+        self.sent += 1
+        return msg
+
+    def prune(self) :
+        now = time.monotonic()
+        for channel_id in [c for c, last in self._last.items() if now - last[2] > self.edit_window] :
+            del self._last[channel_id]
+        for channel_id in [c for c, sent in self._sent.items() if now - sent[-1] > self.per] :
+            del self._sent[channel_id]
+
+    def close(self) :
+        for worker in list(self._workers.values()) :
+            worker.cancel()
+
+    def stats(self) :
+        return {
+            "sent": self.sent,
+            "edited": self.edited,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "pending": sum(map(len, self._pending.values())),
+            "channels": len(self._workers),
+        }
+
+
+# bk-bot-mkb(responses), Created by BK Project
@@ -0,0 +1,82 @@
+import asyncio, collections, itertools, time
+
+from .interactions import CHANNEL_MESSAGE, EPHEMERAL, UPDATE_MESSAGE, respond
+
+ACTION_ROW = 1
+SELECT_MENU = 3
+
+class SelectionManager :
+    def __init__(self, bot, samples=100) :
+        self.bot = bot
+        self._pending = {}
+        self._ids = itertools.count()
+        self.ui_times = collections.deque(maxlen=samples)
+        self.picked = 0
+        self.expired = 0
+
+    def __len__(self) :
+        return len(self._pending)
+
+    async def choose(self, ctx, embed, labels, timeout=60.0) :
+        custom_id = f"choose:{ctx.guild.id}:{next(self._ids)}"
+        menu = {
+            "type": SELECT_MENU,
+            "custom_id": custom_id,
+            "placeholder": "Choose the song",
+            "options": [
+                {"label": label[:100], "value": str(i)} for i, label in enumerate(labels)
+            ],
+        }
+
+        # Registered before sending so a fast click can't arrive first
+        future = asyncio.get_event_loop().create_future()
+        self._pending[custom_id] = (future, ctx.author.id)
+
+        try :
+            started = time.perf_counter()
+            msg = await self.bot.responses.send(ctx, embed, components=[{"type": ACTION_ROW, "components": [menu]}])
+            self.ui_times.append(time.perf_counter() - started)
+
+            try :
+                index = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError :
+                self.expired += 1
+                if msg is not None :
+                    await msg.delete()
+                return None
+
+            self.picked += 1
+            return index
+        finally :
+            self._pending.pop(custom_id, None)
+
+    async def resolve(self, data) :
+        custom_id = data["data"].get("custom_id", "")
+        if (pending := self._pending.get(custom_id)) is None :
+            return False
+
+        future, user_id = pending
+        user = data["member"]["user"] if "member" in data else data["user"]
+
+        if int(user["id"]) != user_id :
+            await respond(self.bot, data, CHANNEL_MESSAGE, {
+                "content": "Only the one who asked can choose the song!", "flags": EPHEMERAL
+            })
+            return True
+
+        # Acknowledging with an update clears the menu in the same round trip
+        await respond(self.bot, data, UPDATE_MESSAGE, {"components": []})
+        if not future.done() :
+            future.set_result(int(data["data"]["values"][0]))
+        return True
+
+    def stats(self) :
+        return {
+            "pending": len(self._pending),
+            "picked": self.picked,
+            "expired": self.expired,
+            "ui_time": sum(self.ui_times) / len(self.ui_times) if self.ui_times else 0.0,
+        }
+
+
+# bk-bot-mkb(selections), Created by BK Project
@@ -0,0 +1,194 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import asyncio, sqlite3, time, wavelink
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS queries ("
+    " query TEXT PRIMARY KEY, playlist TEXT, selected INTEGER, accessed REAL NOT NULL"
+    ") WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS tracks ("
+    " query TEXT NOT NULL, position INTEGER NOT NULL, track TEXT NOT NULL,"
+    " title TEXT, author TEXT, length INTEGER, uri TEXT, identifier TEXT, stream INTEGER,"
+    " PRIMARY KEY (query, position)"
+    ") WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS queries_accessed ON queries (accessed)",
+)
+
+class TrackStore :
+    def __init__(self, path="bot/data/tracks.db", maxsize=50000, max_age=30*24*60*60, flush_interval=5.0, batch_size=64) :
+        self.path = path
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        # SQLite is only ever touched from this one thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="track-store")
+        self._conn = None
+        self._pending = {}
+        self._touched = set()
+        self._task = None
+        self._full = asyncio.Event()
+        self.closed = False
+
+    def _connect(self) :
+        if self._conn is None :
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in SCHEMA :
+                self._conn.execute(statement)
+            self._conn.commit()
+
+        return self._conn
+
+    async def _run(self, func, *args) :
+        return await asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    async def get(self, query) :
+        if (tracks := self._pending.get(query)) is not None :
+            return tracks
+
+        if (tracks := await self._run(self._load, query)) is None :
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touched.add(query)
+        self._schedule()
+        return tracks
+
+    def put(self, query, tracks) :
+        if not tracks :
+            return
+
+        self._pending[query] = tracks
+        self._schedule(now=len(self._pending) >= self.batch_size)
+
+    def _schedule(self, now=False) :
+        if now :
+            # Wakes a flush that is still waiting out its interval
+            self._full.set()
+
+        if self._task is None or self._task.done() :
+            self._task = asyncio.ensure_future(self.flush(delay=0 if now else self.flush_interval))
+
+    async def flush(self, delay=0) :
+        if delay :
+            try :
+                await asyncio.wait_for(self._full.wait(), delay)
+            except asyncio.TimeoutError :
+                pass
+
+        self._full.clear()
+        pending, self._pending = self._pending, {}
+        touched, self._touched = self._touched, set()
+
+        if pending or touched :
+            rows = [(query, self._dump(tracks)) for query, tracks in pending.items()]
+            self.evictions += await self._run(self._write, rows, touched)
+            self.writes += len(rows)
+
+    async def close(self) :
+        # Both the bot shutdown and a cog unload close it, only the first one does the work
+        if self.closed :
+            return
+
+        self.closed = True
+        if self._task is not None :
+            self._task.cancel()
+
+        await self.flush()
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
+
+    def _close(self) :
+        if self._conn is not None :
+            self._conn.close()
+            self._conn = None
+
+    def _load(self, query) :
+        conn = self._connect()
+
+        if (row := conn.execute("SELECT playlist, selected FROM queries WHERE query = ?", (query,)).fetchone()) is None :
+            return None
+
+        tracks = [
+            {
+                "track": track,
+                "info": {
+                    "title": title,
+                    "author": author,
+                    "length": length,
+                    "uri": uri,
+                    "identifier": identifier,
+                    "isStream": bool(stream),
+                },
+            }
+            for track, title, author, length, uri, identifier, stream in conn.execute(
+                "SELECT track, title, author, length, uri, identifier, stream FROM tracks"
+                " WHERE query = ? ORDER BY position",
+                (query,),
+            )
+        ]
+        if not tracks :
+            return None
+
+        if (playlist := row[0]) is not None :
+            return wavelink.TrackPlaylist({
+                "playlistInfo": {"name": playlist, "selectedTrack": row[1]},
+                "tracks": tracks,
+            })
+
+        return [wavelink.Track(t["track"], t["info"]) for t in tracks]
+
+    def _dump(self, tracks) :
+        if isinstance(tracks, wavelink.TrackPlaylist) :
+            info = tracks.data.get("playlistInfo", {})
+            playlist, selected, tracks = info.get("name", ""), info.get("selectedTrack", -1), tracks.tracks
+        else :
+            playlist, selected = None, None
+
+        return playlist, selected, [
+            (t.id, t.title, t.author, t.length, t.uri, t.identifier, int(bool(t.is_stream)))
+            for t in tracks
+        ]
+
+    def _write(self, rows, touched) :
+        conn = self._connect()
+        now = time.time()
+
+        with conn :
+            for query, (playlist, selected, tracks) in rows :
+                conn.execute("DELETE FROM tracks WHERE query = ?", (query,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO queries (query, playlist, selected, accessed) VALUES (?, ?, ?, ?)",
+                    (query, playlist, selected, now),
+                )
+                conn.executemany(
+                    "INSERT INTO tracks (query, position, track, title, author, length, uri, identifier, stream)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((query, i, *track) for i, track in enumerate(tracks)),
+                )
+
+            conn.executemany("UPDATE queries SET accessed = ? WHERE query = ?", ((now, q) for q in touched))
+            return self._evict(conn, now)
+
+    def _evict(self, conn, now) :
+        expired = [q for q, in conn.execute("SELECT query FROM queries WHERE accessed < ?", (now - self.max_age,))]
+
+        if (overflow := conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0] - len(expired) - self.maxsize) > 0 :
+            expired.extend(q for q, in conn.execute(
+                "SELECT query FROM queries WHERE accessed >= ? ORDER BY accessed LIMIT ?",
+                (now - self.max_age, overflow),
+            ))
+
+        conn.executemany("DELETE FROM tracks WHERE query = ?", ((q,) for q in expired))
+        conn.executemany("DELETE FROM queries WHERE query = ?", ((q,) for q in expired))
+        return len(expired)
+
+
+# bk-bot-mkb(track store), Created by BK Project
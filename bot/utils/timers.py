@@ -0,0 +1,61 @@
+import asyncio, inspect, logging, math
+
+log = logging.getLogger("bot.timers")
+
+class TimerWheel :
+    def __init__(self, resolution=1.0, slots=64) :
+        self.resolution = resolution
+        self._slots = [{} for _ in range(slots)]
+        self._keys = {}
+        self._cursor = 0
+        self.fired = 0
+
+    def __len__(self) :
+        return len(self._keys)
+
+    def __contains__(self, key) :
+        return key in self._keys
+
+    def schedule(self, key, delay, callback, *args) :
+        self.cancel(key)
+        ticks = max(math.ceil(delay / self.resolution), 1)
+        slot = (self._cursor + ticks) % len(self._slots)
+
+        self._slots[slot][key] = [(ticks - 1) // len(self._slots), callback, args]
+        self._keys[key] = slot
+
+    def cancel(self, key) :
+        if (slot := self._keys.pop(key, None)) is not None :
+            del self._slots[slot][key]
+
+    def tick(self) :
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot = self._slots[self._cursor]
+
+        for key, timer in list(slot.items()) :
+            if timer[0] > 0 :
+                timer[0] -= 1
+                continue
+
+            del slot[key]
+            del self._keys[key]
+            self.fired += 1
+
+            if inspect.iscoroutine(result := timer[1](*timer[2])) :
+                asyncio.ensure_future(result)
+
+    async def run(self) :
+        loop = asyncio.get_event_loop()
+        deadline = loop.time()
+
+        while True :
+            deadline += self.resolution
+            await asyncio.sleep(max(deadline - loop.time(), 0))
+
+            try :
+                self.tick()
+            except Exception :
+                log.exception("Timer wheel tick failed")
+
+
+# bk-bot-mkb(timer wheel), Created by BK Project
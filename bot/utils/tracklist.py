@@ -0,0 +1,220 @@
+from itertools import islice
+
+LOAD = 256 # Tracks per block before it gets split
+
+class TrackList :
+    def __init__(self, iterable=()) :
+        self._blocks = []
+        self._tree = [0]
+        self._len = 0
+        self.extend(iterable)
+
+    def __len__(self) :
+        return self._len
+
+    def __bool__(self) :
+        return self._len > 0
+
+    def __iter__(self) :
+        for block in self._blocks :
+            yield from block
+
+    def __getitem__(self, index) :
+        if isinstance(index, slice) :
+            return list(self.islice(*index.indices(self._len)[:2]))
+
+        block, offset = self._locate(self._normalize(index))
+        return self._blocks[block][offset]
+
+    def __setitem__(self, index, value) :
+        block, offset = self._locate(self._normalize(index))
+        self._blocks[block][offset] = value
+
+    def __delitem__(self, index) :
+        self.pop(index)
+
+    def _normalize(self, index) :
+        if index < 0 :
+            index += self._len
+
+        if not 0 <= index < self._len :
+            raise IndexError("track index out of range")
+
+        return index
+
+    # Fenwick tree over block lengths, so finding a block is O(log n)
+    def _rebuild(self) :
+        tree = [0] * (len(self._blocks) + 1)
+
+        for i, block in enumerate(self._blocks, 1) :
+            tree[i] += len(block)
+            if (parent := i + (i & -i)) < len(tree) :
+                tree[parent] += tree[i]
+
+        self._tree = tree
+
+    def _update(self, block, delta) :
+        i = block + 1
+        while i < len(self._tree) :
+            self._tree[i] += delta
+            i += i & -i
+
+    def _locate(self, index) :
+        tree, pos = self._tree, 0
+        step = 1 << (len(tree) - 1).bit_length()
+
+        while step :
+            if (nxt := pos + step) < len(tree) and tree[nxt] <= index :
+                pos = nxt
+                index -= tree[nxt]
+            step >>= 1
+
+        return pos, index
+
+    def islice(self, start=0, stop=None) :
+        if stop is None or stop > self._len :
+            stop = self._len
+
+        if start >= stop :
+            return iter(())
+
+        block, offset = self._locate(start)
+        return islice(self._iter_from(block, offset), stop - start)
+
+    def _iter_from(self, block, offset) :
+        yield from islice(self._blocks[block], offset, None)
+        for i in range(block + 1, len(self._blocks)) :
+            yield from self._blocks[i]
+
+    def append(self, value) :
+        self.extend((value,))
+
+    def extend(self, iterable) :
+        values = list(iterable)
+        if not values :
+            return
+
+        self._len += len(values)
+
+        if self._blocks and len(last := self._blocks[-1]) < LOAD :
+            fill = LOAD - len(last)
+            last.extend(values[:fill])
+            self._update(len(self._blocks) - 1, min(fill, len(values)))
+            values = values[fill:]
+
+        if values :
+            self._blocks.extend(values[i:i + LOAD] for i in range(0, len(values), LOAD))
+            self._rebuild()
+
+    def insert(self, index, value) :
+        if index < 0 :
+            index = max(index + self._len, 0)
+
+        if index >= self._len :
+            return self.append(value)
+
+        block, offset = self._locate(index)
+        self._blocks[block].insert(offset, value)
+        self._len += 1
+
+        if len(self._blocks[block]) > LOAD * 2 :
+            half = self._blocks[block][LOAD:]
+            del self._blocks[block][LOAD:]
+            self._blocks.insert(block + 1, half)
+            self._rebuild()
+        else :
+            self._update(block, 1)
+
+    def pop(self, index=-1) :
+        block, offset = self._locate(self._normalize(index))
+        value = self._blocks[block].pop(offset)
+        self._len -= 1
+
+        if not self._blocks[block] :
+            del self._blocks[block]
+            self._rebuild()
+        else :
+            self._update(block, -1)
+
+        return value
+
+    def move(self, src, dst) :
+        self.insert(dst, self.pop(src))
+
+    def trim(self, count) :
+        count = min(count, self._len)
+        trimmed = list(self.islice(0, count))
+
+        if count :
+            block, offset = self._locate(count) if count < self._len else (len(self._blocks), 0)
+            del self._blocks[:block]
+            if offset :
+                del self._blocks[0][:offset]
+
+            self._len -= count
+            self._rebuild()
+
+        return trimmed
+
+    def truncate(self, size) :
+        if size <= 0 :
+            return self.clear()
+
+        if size >= self._len :
+            return
+
+        block, offset = self._locate(size)
+        del self._blocks[block][offset:]
+        del self._blocks[block + 1:]
+        if not self._blocks[block] :
+            del self._blocks[block]
+
+        self._len = size
+        self._rebuild()
+
+    def clear(self) :
+        self._blocks.clear()
+        self._tree = [0]
+        self._len = 0
+
+
+class TrackView :
+    def __init__(self, tracks, start=0, stop=None) :
+        self._tracks = tracks
+        self.start = start
+        self.stop = stop
+
+    def _bounds(self) :
+        stop = len(self._tracks) if self.stop is None else min(self.stop, len(self._tracks))
+        return max(self.start, 0), stop
+
+    def __len__(self) :
+        start, stop = self._bounds()
+        return max(stop - start, 0)
+
+    def __bool__(self) :
+        return len(self) > 0
+
+    def __iter__(self) :
+        return self._tracks.islice(*self._bounds())
+
+    def __getitem__(self, index) :
+        start, stop = self._bounds()
+
+        if isinstance(index, slice) :
+            if index.step not in (None, 1) :
+                return list(self)[index]
+
+            first, last, _ = index.indices(max(stop - start, 0))
+            return list(self._tracks.islice(start + first, start + last))
+
+        if index < 0 :
+            index += stop - start
+
+        if not 0 <= index < stop - start :
+            raise IndexError("track index out of range")
+
+        return self._tracks[start + index]
+
+
+# bk-bot-mkb(track list), Created by BK Project
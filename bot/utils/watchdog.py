@@ -0,0 +1,117 @@
+import asyncio, collections, logging, sys, threading, time, traceback
+
+from pathlib import Path
+
+log = logging.getLogger("bot.watchdog")
+
+ROOT = str(Path(__file__).resolve().parents[1])
+
+class Stall :
+    __slots__ = ("started", "duration", "owner", "stack")
+
+    def __init__(self, started, owner, stack) :
+        self.started = started
+        self.duration = None
+        self.owner = owner
+        self.stack = stack
+
+def frame_owner(frame, task=None) :
+    # Innermost command context on the stack, else the listener task, else our own code
+    inner = None
+    while frame is not None :
+        ctx = frame.f_locals.get("ctx")
+        if (command := getattr(ctx, "command", None)) is not None :
+            return f"command {getattr(command, 'qualified_name', command)}"
+        if (name := getattr(ctx, "command_name", None)) is not None :
+            return f"slash command {name}"
+        if inner is None and frame.f_code.co_filename.startswith(ROOT) :
+            inner = f"{frame.f_code.co_name} ({Path(frame.f_code.co_filename).name}:{frame.f_lineno})"
+        frame = frame.f_back
+
+    if task is not None and (name := task.get_name()).startswith("discord.py: ") :
+        return f"listener {name[12:]}"
+
+    return inner or "unknown"
+
+class LoopWatchdog :
+    def __init__(self, threshold=0.25, interval=0.1, samples=600, stalls=20) :
+        self.threshold = threshold
+        self.interval = interval
+        self.lags = collections.deque(maxlen=samples)
+        self.stalls = collections.deque(maxlen=stalls)
+        self.max_lag = 0.0
+        self.stalled = 0
+        self._beat = None
+        self._stall = None
+        self._loop = None
+        self._thread_id = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def lag(self) :
+        return self.lags[-1] if self.lags else 0.0
+
+    def percentile(self, share) :
+        if not self.lags :
+            return 0.0
+
+        ordered = sorted(self.lags)
+        return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+    async def run(self) :
+        self._loop = asyncio.get_event_loop()
+        self._thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+        try :
+            while True :
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                lag = max(now - self._beat - self.interval, 0.0)
+                self._beat = now
+                self.lags.append(lag)
+                self.max_lag = max(self.max_lag, lag)
+
+                if (stall := self._stall) is not None :
+                    self._stall = None
+                    stall.duration = lag
+                    log.warning("Event loop was blocked for %.0f ms by %s", lag * 1000, stall.owner)
+        finally :
+            self._stop.set()
+
+    def watch(self) :
+        while not self._stop.wait(self.interval) :
+            if self._stall is not None or time.monotonic() - self._beat < self.threshold :
+                continue
+
+            # Only the first look at a stall is kept, that is the code that is still running
+            if (frame := sys._current_frames().get(self._thread_id)) is None :
+                continue
+
+            try :
+                task = asyncio.current_task(self._loop)
+            except RuntimeError :
+                task = None
+
+            stack = "".join(traceback.format_stack(frame, limit=12))
+            self._stall = stall = Stall(time.time(), frame_owner(frame, task), stack)
+            del frame
+            self.stalls.append(stall)
+            self.stalled += 1
+            log.warning("Event loop blocked for over %.0f ms in %s\n%s", self.threshold * 1000, stall.owner, stack.rstrip())
+
+    def stats(self) :
+        return {
+            "lag": self.lag,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "max": self.max_lag,
+            "stalls": self.stalled,
+        }
+
+
+# bk-bot-mkb(loop watchdog), Created by BK Project